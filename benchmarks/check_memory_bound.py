@@ -0,0 +1,89 @@
+"""Check that a full resync and export runs in bounded memory.
+
+Runs 'resync' end to end (search pages -> issue store -> rows -> sinks) for a
+small and a large synthetic project against the mock Jira server, and fails
+unless the tracemalloc peak of the large run stays within --max-growth times
+the peak of the small one. The mock server runs in a child process so that
+only the client's allocations are measured. Exits 1 when the bound is broken:
+
+    python benchmarks/check_memory_bound.py --sizes 2000 20000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+from mock_jira import MockJiraServer
+from synthetic_issues import USERS, generate_issues, user
+
+DEFAULT_SIZES = [2000, 20000]
+DEFAULT_MAX_GROWTH = 1.5
+
+
+def serve(size, connection):
+    """Child process: serve `size` synthetic issues until the parent closes the pipe."""
+    with MockJiraServer(generate_issues(size), users=[user(name) for name in USERS]) as server:
+        connection.send(server.url)
+        try:
+            connection.recv()
+        except EOFError:
+            pass
+
+
+def peak_memory(size, formats, shard_size=0, options=()):
+    """Return the tracemalloc peak (bytes) of a resync + export of `size` issues.
+
+    tracemalloc must already be running; options are extra command-line
+    arguments such as ['--page-size', '20'].
+    """
+    parent, child = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(size, child), daemon=True)
+    server.start()
+    url = parent.recv()
+    try:
+        with tempfile.TemporaryDirectory(prefix='jira-memory-') as workdir:
+            argv = [
+                'resync', '--url', url, '--email', 'bench@example.com', '--api-token', 'token', '--jql', '',
+                '--output', os.path.join(workdir, 'jira_tasks.xlsx'), '--store', os.path.join(workdir, 'jira_issues.db'),
+                '--metrics-file', os.path.join(workdir, 'metrics.json'),
+                '--prometheus-file', os.path.join(workdir, 'metrics.prom'),
+                '--formats', *formats, '--shard-size', str(shard_size), '--log-level', 'WARNING', *options
+            ]
+            tracemalloc.reset_peak()
+            jira.main(argv)
+            return tracemalloc.get_traced_memory()[1]
+    finally:
+        parent.send('stop')
+        server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs=2, default=DEFAULT_SIZES, metavar=('SMALL', 'LARGE'))
+    parser.add_argument('--max-growth', type=float, default=DEFAULT_MAX_GROWTH,
+                        help='allowed ratio between the large and the small peak')
+    parser.add_argument('--formats', nargs='+', default=jira.DEFAULT_EXPORT_FORMATS, choices=sorted(jira.EXPORT_SINKS))
+    parser.add_argument('--shard-size', type=int, default=0, help='also exercise sharded fetching')
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    peaks = [peak_memory(size, args.formats, args.shard_size) for size in args.sizes]
+    tracemalloc.stop()
+
+    for size, peak in zip(args.sizes, peaks):
+        print(f"{size:>8} issues: peak {peak / 2 ** 20:.1f} MB")
+    growth = peaks[1] / peaks[0]
+    print(f"{args.sizes[1] / args.sizes[0]:.0f}x the issues -> {growth:.2f}x the peak (allowed {args.max_growth:.2f}x)")
+    if growth > args.max_growth:
+        print("FAIL: peak memory grows with the number of issues")
+        sys.exit(1)
+    print("OK: peak memory is bounded by the page size")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""A local stand-in for the Jira REST endpoints used by jira_fetch_and_update.py.
+
+Serves synthetic issues (see synthetic_issues.py) over HTTP with optional
+per-request latency and injected 429 responses, so fetches and updates can be
+benchmarked offline and repeatably.
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_MAX_RESULTS = 100  # Jira Cloud caps search pages at 100 issues
+JIRA_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.000+0000'
+
+
+def _created(issue):
+    return datetime.strptime(issue['fields']['created'], JIRA_TIME_FORMAT)
+
+
+def _key_order(issue):
+    project, _, number = issue['key'].rpartition('-')
+    return project, int(number)
+
+
+class MockJiraServer:
+    """Threaded mock Jira server; use as a context manager or call start()/stop().
+
+    latency is added to every request (seconds). With rate_limit_every=N every
+    Nth request is answered with 429 and a Retry-After of retry_after seconds.
+    """
+
+    def __init__(self, issues, users=(), latency=0.0, rate_limit_every=0, retry_after=0, host='127.0.0.1', port=0):
+        self.issues = issues
+        self.issues_by_key = {issue['key']: issue for issue in issues}
+        self.created = {issue['key']: _created(issue) for issue in issues}  # Parsed once, filtered by every shard query
+        self.users = list(users)
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rate_limited = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+        self._queries = {}  # JQL -> matching issues in result order
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def should_rate_limit(self):
+        with self._lock:
+            self.requests += 1
+            limited = self.rate_limit_every and self.requests % self.rate_limit_every == 0
+            if limited:
+                self.rate_limited += 1
+            return limited
+
+    def search(self, jql):
+        """Evaluate the small JQL subset the client sends: project, created and updated filters plus ORDER BY."""
+        with self._lock:
+            cached = self._queries.get(jql)
+        if cached is not None:
+            return cached
+
+        matches = self.issues
+        for project in re.findall(r'project\s*=\s*"([^"]+)"', jql):
+            matches = [issue for issue in matches if issue['key'].rpartition('-')[0].lower() == project.lower()]
+        for operator, value in re.findall(r'created\s*(>=|<)\s*"([^"]+)"', jql):
+            bound = datetime.strptime(value, '%Y/%m/%d %H:%M')
+            matches = [issue for issue in matches if (self.created[issue['key']] >= bound) == (operator == '>=')]
+        for minutes in re.findall(r'updated\s*>=\s*"-(\d+)m"', jql):
+            cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=int(minutes))
+            bound = cutoff.strftime(JIRA_TIME_FORMAT)
+            matches = [issue for issue in matches if issue['fields']['updated'] >= bound]
+
+        order = re.search(r'order\s+by\s+created\s+(asc|desc)', jql, re.IGNORECASE)
+        if order:
+            matches = sorted(matches, key=lambda issue: self.created[issue['key']], reverse=order.group(1).lower() == 'desc')
+        else:
+            matches = sorted(matches, key=_key_order)
+        with self._lock:
+            self._queries[jql] = matches
+        return matches
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like Jira Cloud
+            disable_nagle_algorithm = True  # Headers and body go out as separate writes; don't stall on delayed ACKs
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, status, payload=None, headers=None):
+                body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def read_json(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'null')
+
+            def throttled(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.should_rate_limit():
+                    self.send_json(429, {'errorMessages': ['Rate limit exceeded']},
+                                   {'Retry-After': str(server.retry_after)})
+                    return True
+                return False
+
+            def do_POST(self):
+                query = self.read_json()
+                if self.throttled():
+                    return
+                if urlparse(self.path).path != '/rest/api/2/search':
+                    return self.send_json(404, {'errorMessages': ['Not found']})
+
+                matches = server.search(query.get('jql', ''))
+                start_at = int(query.get('startAt', 0))
+                max_results = min(int(query.get('maxResults', 50)), SEARCH_MAX_RESULTS)
+                fields = query.get('fields') or []
+                page = [
+                    {'id': issue['id'], 'key': issue['key'],
+                     'fields': {name: issue['fields'].get(name) for name in fields if name in issue['fields']}}
+                    for issue in matches[start_at:start_at + max_results]
+                ]
+                self.send_json(200, {'startAt': start_at, 'maxResults': max_results,
+                                     'total': len(matches), 'issues': page})
+
+            def do_GET(self):
+                if self.throttled():
+                    return
+                url = urlparse(self.path)
+                params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+                if url.path == '/rest/api/3/user/search':
+                    name = params.get('query', '')
+                    return self.send_json(200, [user for user in server.users if user['displayName'] == name])
+
+                match = re.fullmatch(r'/rest/api/2/issue/([^/]+)/(worklog|comment)', url.path)
+                issue = server.issues_by_key.get(match.group(1)) if match else None
+                if issue is None:
+                    return self.send_json(404, {'errorMessages': ['Issue does not exist']})
+                list_key = 'worklogs' if match.group(2) == 'worklog' else 'comments'
+                items = issue[f'_{list_key}']
+                start_at = int(params.get('startAt', 0))
+                max_results = min(int(params.get('maxResults', 50)), SEARCH_MAX_RESULTS)
+                self.send_json(200, {'startAt': start_at, 'maxResults': max_results, 'total': len(items),
+                                     list_key: items[start_at:start_at + max_results]})
+
+            def do_PUT(self):
+                update = self.read_json()
+                if self.throttled():
+                    return
+                match = re.fullmatch(r'/rest/api/2/issue/([^/]+)', urlparse(self.path).path)
+                if not match or match.group(1) not in server.issues_by_key:
+                    return self.send_json(404, {'errorMessages': ['Issue does not exist']})
+                if not isinstance(update, dict) or 'fields' not in update:
+                    return self.send_json(400, {'errorMessages': ['Missing fields']})
+                with server._lock:
+                    server.updates += 1
+                self.send_json(204)
+
+        return Handler
@@ -0,0 +1,170 @@
+"""Offline benchmarks for jira_fetch_and_update.py.
+
+Starts a local mock Jira server loaded with synthetic issues, runs every stage
+of a fetch and an update against it, and writes timings, rows/s and peak
+memory per stage and dataset size as JSON, e.g.:
+
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --output before.json
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --baseline before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+from mock_jira import MockJiraServer
+from synthetic_issues import USERS, generate_issues, user
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+class StageTimer:
+    """Runs benchmark stages and records wall time, rows/s and peak memory for each."""
+
+    def __init__(self, size, trace_memory=False):
+        self.size = size
+        self.trace_memory = trace_memory
+        self.results = []
+
+    def run(self, stage, func, rows=None):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - start
+        rows = rows if rows is not None else (len(value) if hasattr(value, '__len__') else self.size)
+        result = {
+            'size': self.size,
+            'stage': stage,
+            'seconds': round(seconds, 4),
+            'rows': rows,
+            'rows_per_second': round(rows / seconds, 1) if seconds else None,
+            'peak_rss_mb': round(jira.RunMetrics.peak_rss_bytes() / 2 ** 20, 1),
+            'traced_peak_mb': round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1) if self.trace_memory else None
+        }
+        self.results.append(result)
+        print(f"{self.size:>8} {stage:<26} {seconds:>9.3f}s {result['rows_per_second'] or 0:>12.1f} rows/s "
+              f"{result['peak_rss_mb']:>9.1f} MB RSS", flush=True)
+        return value
+
+
+def benchmark_size(size, args, workdir):
+    """Run every stage against a mock server holding `size` issues; return (stage results, run metrics)."""
+    issues = generate_issues(size, projects=tuple(args.projects), seed=args.seed)
+    jira.metrics.reset()
+    timer = StageTimer(size, args.trace_memory)
+    output_file = os.path.join(workdir, f"jira_tasks_{size}.xlsx")
+
+    with MockJiraServer(issues, users=[user(name) for name in USERS], latency=args.latency,
+                        rate_limit_every=args.rate_limit_every, retry_after=args.retry_after) as server:
+        formatter = jira.JiraExcelFormatter(
+            f"{server.url}/rest/api/2/search", 'bench@example.com', 'token', output_file,
+            jql=' OR '.join(f'project = "{project}"' for project in args.projects),
+            page_size=args.page_size, max_workers=args.workers, profile=args.profile, report_savings=False,
+            shard_size=args.shard_size
+        )
+        fetched = timer.run('fetch_jira_data', formatter.fetch_jira_data)
+        task_list = timer.run('prepare_task_list', lambda: formatter.prepare_task_list(fetched))
+        timer.run('save_to_excel', lambda: formatter.save_to_excel(task_list), rows=len(task_list))
+        timer.run('format_excel', formatter.format_excel, rows=len(task_list))
+
+        streamed = jira.JiraExcelFormatter(
+            formatter.jira_url, 'bench@example.com', 'token', os.path.join(workdir, f"jira_export_{size}.xlsx"),
+            session=formatter.session, profile=args.profile, report_savings=False
+        )
+        timer.run('export', lambda: streamed.export(task_list, args.formats), rows=len(task_list))
+
+        updater = jira.JiraUpdaterFromExcel(
+            server.url, 'bench@example.com', 'token', output_file, max_workers=args.workers,
+            rate=args.update_rate, burst=args.update_burst
+        )
+        timer.run('process_and_update_issues', updater.process_and_update_issues)
+        print(f"{size:>8} mock server: {server.requests} requests, {server.rate_limited} rate limited, "
+              f"{server.updates} updates", flush=True)
+    return timer.results, jira.metrics.summary()
+
+
+def compare(results, baseline_file):
+    """Print each stage's time relative to a previous results file."""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = {(r['size'], r['stage']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_file} (ratio < 1.00 is faster):")
+    for result in results:
+        before = baseline.get((result['size'], result['stage']))
+        if before and before['seconds']:
+            print(f"{result['size']:>8} {result['stage']:<26} {before['seconds']:>9.3f}s -> "
+                  f"{result['seconds']:>9.3f}s  x{result['seconds'] / before['seconds']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='dataset sizes to run, e.g. 1000 10000 100000')
+    parser.add_argument('--projects', nargs='+', default=['BENCH'], help='project keys to spread issues over')
+    parser.add_argument('--profile', default=jira.DEFAULT_EXPORT_PROFILE, choices=sorted(jira.EXPORT_PROFILES))
+    parser.add_argument('--formats', nargs='+', default=jira.DEFAULT_EXPORT_FORMATS, choices=sorted(jira.EXPORT_SINKS))
+    parser.add_argument('--page-size', type=int, default=jira.DEFAULT_PAGE_SIZE)
+    parser.add_argument('--workers', type=int, default=jira.DEFAULT_MAX_WORKERS)
+    parser.add_argument('--shard-size', type=int, default=None, help='enable sharded fetching with this shard size')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every mock request')
+    parser.add_argument('--rate-limit-every', type=int, default=0, help='answer every Nth request with 429')
+    parser.add_argument('--retry-after', type=int, default=0, help='Retry-After seconds sent with each 429')
+    parser.add_argument('--update-rate', type=float, default=1e6, help='updater requests per second')
+    parser.add_argument('--update-burst', type=int, default=jira.DEFAULT_UPDATE_BURST)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--trace-memory', action='store_true', help='also record the tracemalloc peak of each stage')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    jira.logger.setLevel(args.log_level.upper())
+    if args.trace_memory:
+        tracemalloc.start()
+
+    results = []
+    run_metrics = {}
+    with tempfile.TemporaryDirectory(prefix='jira-bench-') as workdir:
+        print(f"{'size':>8} {'stage':<26} {'time':>10} {'throughput':>19} {'peak':>12}")
+        for size in args.sizes:
+            size_results, run_metrics[str(size)] = benchmark_size(size, args, workdir)
+            results.extend(size_results)
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'xlsxwriter': jira.module_available('xlsxwriter'),
+        'settings': {name: value for name, value in vars(args).items() if name not in ('output', 'baseline')},
+        'results': results,
+        'metrics': run_metrics
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
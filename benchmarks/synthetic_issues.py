@@ -0,0 +1,116 @@
+"""Deterministic synthetic Jira issues for the offline benchmarks."""
+import random
+from datetime import datetime, timedelta
+
+JIRA_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.000+0000'
+DEFAULT_PROJECTS = ('BENCH',)
+USERS = [
+    'Alice Adams', 'Bob Brown', 'Carol Clark', 'Dan Davis', 'Eve Evans', 'Frank Fisher', 'Grace Green',
+    'Heidi Hill', 'Ivan Irwin', 'Judy Jones', 'Karl King', 'Liam Lee', 'Mia Moore', 'Nina Nash', 'Oscar Owen'
+]
+STATUSES = ['To Do', 'In Progress', 'In Review', 'Done']
+PRIORITIES = ['Low', 'Medium', 'High', 'Critical']
+CATEGORIES = ['Infrastructure', 'Pipeline', 'Monitoring', 'Security']
+TEAMS = ['Platform', 'SRE', 'Build', 'Data']
+LABELS = ['backend', 'frontend', 'ops', 'tech-debt', 'customer', 'urgent']
+EMBEDDED_PAGE_SIZE = 20  # Jira embeds at most this many worklogs/comments in search results
+WORDS = (
+    'deploy pipeline cluster node latency alert rollout config secret certificate backup '
+    'restore migration dashboard runner cache queue retry timeout upgrade patch'
+).split()
+
+
+def account_id(display_name):
+    """Stable fake account ID for a synthetic user."""
+    return f"acc-{USERS.index(display_name):04d}"
+
+
+def user(display_name):
+    return {'accountId': account_id(display_name), 'displayName': display_name}
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def paged(list_key, items):
+    """Embed a worklog/comment list the way the search API does: truncated to the first page."""
+    return {'startAt': 0, 'maxResults': EMBEDDED_PAGE_SIZE, 'total': len(items), list_key: items[:EMBEDDED_PAGE_SIZE]}
+
+
+def generate_issues(count, projects=DEFAULT_PROJECTS, seed=0):
+    """Return count issues spread over the projects, shaped like /rest/api/2/search results.
+
+    Each issue also carries its full worklog and comment lists under the private
+    '_worklogs' and '_comments' keys, served by the per-issue endpoints.
+    """
+    rng = random.Random(seed)
+    base = datetime(2023, 1, 1)
+    issues = []
+    numbers = dict.fromkeys(projects, 0)
+    for index in range(count):
+        project = projects[index % len(projects)]
+        numbers[project] += 1
+        key = f"{project}-{numbers[project]}"
+        created = base + timedelta(minutes=rng.randint(0, 60 * 24 * 600))
+        updated = created + timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        status = rng.choice(STATUSES)
+        resolved = status == 'Done'
+
+        worklogs = [
+            {'id': str(n), 'author': user(rng.choice(USERS)), 'timeSpent': f"{rng.randint(1, 8)}h",
+             'timeSpentSeconds': 3600, 'started': updated.strftime(JIRA_TIME_FORMAT)}
+            for n in range(rng.choice((0, 0, 0, 1, 3, 25)))
+        ]
+        comments = [
+            {'id': str(n), 'author': user(rng.choice(USERS)), 'body': sentence(rng, 12),
+             'created': updated.strftime(JIRA_TIME_FORMAT)}
+            for n in range(rng.choice((0, 1, 2, 5, 30)))
+        ]
+        fields = {
+            'summary': sentence(rng, 6),
+            'status': {'name': status, 'statusCategory': {'key': 'done' if resolved else 'indeterminate'}},
+            'customfield_10035': {'value': rng.choice(CATEGORIES)},
+            'assignee': user(rng.choice(USERS)) if rng.random() < 0.9 else None,
+            'duedate': (created + timedelta(days=14)).strftime('%Y-%m-%d') if rng.random() < 0.5 else None,
+            'priority': {'name': rng.choice(PRIORITIES)},
+            'labels': rng.sample(LABELS, rng.randint(0, 3)),
+            'created': created.strftime(JIRA_TIME_FORMAT),
+            'updated': updated.strftime(JIRA_TIME_FORMAT),
+            'reporter': user(rng.choice(USERS)),
+            'customfield_10001': {'name': rng.choice(TEAMS)},
+            'statuscategorychangedate': updated.strftime(JIRA_TIME_FORMAT),
+            'parent': {'key': f"{project}-{rng.randint(1, numbers[project])}"} if rng.random() < 0.3 else None,
+            'fixVersions': [{'name': f"1.{rng.randint(0, 9)}"}] if rng.random() < 0.4 else [],
+            'resolution': {'name': 'Done'} if resolved else None,
+            'customfield_10112': None,
+            'customfield_10113': None,
+            'customfield_10114': None,
+            'timeestimate': rng.choice((None, 3600, 7200)),
+            'aggregatetimeoriginalestimate': rng.choice((None, 14400)),
+            'versions': [],
+            'issuelinks': [{'outwardIssue': {'key': f"{project}-{rng.randint(1, numbers[project])}"}}]
+            if rng.random() < 0.2 else [],
+            'creator': user(rng.choice(USERS)),
+            'subtasks': [],
+            'progress': {'progress': len(worklogs) * 3600, 'total': 14400},
+            'votes': {'votes': rng.randint(0, 3)},
+            'worklog': paged('worklogs', worklogs),
+            'comment': paged('comments', comments),
+            'timespent': len(worklogs) * 3600 or None,
+            'resolutiondate': updated.strftime(JIRA_TIME_FORMAT) if resolved else None,
+            'workratio': -1,
+            'watches': {'watchCount': rng.randint(1, 5)},
+            'customfield_10020': [{'name': f"Sprint {rng.randint(1, 40)}"}] if rng.random() < 0.7 else None,
+            'customfield_10021': [{'value': 'Impediment'}] if rng.random() < 0.05 else None,
+            'timeoriginalestimate': rng.choice((None, 14400)),
+            'description': '\n'.join(sentence(rng, 15) for _ in range(rng.randint(1, 6))),
+            'customfield_10014': None,
+            'timetracking': {'originalEstimate': '4h'} if rng.random() < 0.5 else {},
+            'environment': None,
+        }
+        issues.append({
+            'id': str(10000 + index), 'key': key, 'fields': fields,
+            '_worklogs': worklogs, '_comments': comments
+        })
+    return issues
@@ -1,157 +1,1707 @@
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-import pandas as pd
-from jinja2 import Template
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Border, Side, PatternFill
+# pandas, openpyxl and jinja2 (plus the optional xlsxwriter and pyarrow) are
+# imported where they are used, so each action only loads what it needs
+import argparse
+import codecs
+import importlib.util
 import logging
 import sys
+import cProfile
+import csv
+import json
+import math
+import re
+import sqlite3
+import os
+import posixpath
+import queue
+import random
+import signal
+import threading
+import time
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from itertools import islice
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then reported as 0
+    resource = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger()
 
+# Every field the export used to request; kept as the baseline for the
+# projection savings report and for ad-hoc "all fields" searches
+JIRA_FIELD_IDS = [
+    'statuscategorychangedate', 'parent', 'fixVersions', 'statusCategory', 'resolution',
+    'customfield_10112', 'customfield_10113', 'customfield_10114', 'customfield_10104',
+    'lastViewed', 'priority', 'labels', 'customfield_10103', 'timeestimate',
+    'aggregatetimeoriginalestimate', 'versions', 'issuelinks', 'assignee', 'status',
+    'components', 'issuekey', 'aggregatetimeestimate', 'creator', 'subtasks',
+    'reporter', 'aggregateprogress', 'progress', 'votes', 'worklog', 'issuetype',
+    'timespent', 'customfield_10030', 'project', 'customfield_10031', 'customfield_10032',
+    'customfield_10033', 'aggregatetimespent', 'customfield_10034', 'customfield_10035',
+    'customfield_10037', 'customfield_10027', 'customfield_10028', 'customfield_10029',
+    'resolutiondate', 'workratio', 'watches', 'issuerestriction', 'thumbnail',
+    'created', 'customfield_10020', 'customfield_10021', 'customfield_10022',
+    'customfield_10023', 'customfield_10024', 'customfield_10025', 'customfield_10026',
+    'customfield_10016', 'customfield_10017', 'customfield_10018', 'customfield_10019',
+    'updated', 'timeoriginalestimate', 'description', 'customfield_10010',
+    'customfield_10011', 'customfield_10012', 'customfield_10013', 'customfield_10014',
+    'timetracking', 'customfield_10015', 'customfield_10005', 'customfield_10126',
+    'customfield_10006', 'security', 'customfield_10007', 'customfield_10008',
+    'attachment', 'customfield_10009', 'summary', 'customfield_10120',
+    'customfield_10000', 'customfield_10121', 'customfield_10122', 'customfield_10001',
+    'customfield_10123', 'customfield_10002', 'customfield_10003', 'customfield_10124',
+    'customfield_10125', 'customfield_10004', 'customfield_10115', 'customfield_10116',
+    'environment', 'customfield_10117', 'customfield_10118', 'customfield_10119',
+    'duedate', 'comment'
+]
+
+# Default search settings; pages are fetched concurrently over one pooled session
+DEFAULT_JQL = 'project="DevOps"'  # Modify project key as needed
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_WORKERS = 8
+
+# Streaming fetch: response bodies are decoded one issue at a time from chunks
+# of this size, and at most max_workers pages wait between the fetch workers and
+# the consumer, so memory stays proportional to the page size, not the project
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# Sharded fetch (opt-in): queries larger than the shard size are split into disjoint
+# 'created' date ranges, each fetched by one worker and retried on its own
+DEFAULT_SHARD_SIZE = 5000
+SHARD_RETRIES = 3
+
+# Local issue store used for incremental syncs; the overlap re-reads a few
+# minutes before the last sync so that clock skew never drops an update
+DEFAULT_STORE_FILE = 'jira_issues.db'
+SYNC_OVERLAP_MINUTES = 5
+
+# Assignee account-ID resolution: in-memory LRU size, optional on-disk cache and its TTL
+ASSIGNEE_CACHE_SIZE = 4096
+DEFAULT_ASSIGNEE_CACHE_FILE = 'jira_assignees.json'
+ASSIGNEE_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Bulk updates: requests per second shared by all workers, burst size and retry policy
+DEFAULT_UPDATE_RATE = 10.0
+DEFAULT_UPDATE_BURST = 10
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds, doubled on every retry
+BACKOFF_MAX = 60.0
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+# (connect, read) seconds; the read timeout applies to every socket read, also of streamed bodies
+REQUEST_TIMEOUT = (10, 60)
+DEFAULT_UPDATE_REPORT_FILE = 'jira_update_report.json'
+
+# Update plans: the only workbook columns the updater reads, and where dry runs save the plan
+UPDATE_COLUMNS = ['Task Key', 'Priority', 'Summary', 'Assignee', 'Category', 'Team']
+DEFAULT_UPDATE_PLAN_FILE = 'jira_update_plan.json'
+DESCRIPTION_TEMPLATE = '''
+        h2. Task Details
+
+        || Item || Description ||
+        | *Summary* | {{ summary }} |
+        | *Category* | {{ category }} |
+        | *Team* | {{ team }} |
+        '''
+
+# Workbook values of these columns are snapshotted next to the workbook at export
+# time, so that updates only send what was edited in the sheet. The description
+# is rendered from DESCRIPTION_COLUMNS and only re-sent when one of them changed.
+SNAPSHOT_COLUMNS = ['Priority', 'Summary', 'Assignee', 'Category', 'Team']
+DESCRIPTION_COLUMNS = ['Summary', 'Category', 'Team']
+
+# Run metrics: per-phase timings and HTTP statistics, written as JSON and as a
+# Prometheus textfile (for node_exporter's textfile collector) after each run
+DEFAULT_METRICS_FILE = 'jira_metrics.json'
+DEFAULT_PROMETHEUS_FILE = 'jira_metrics.prom'
+HTTP_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))  # seconds
+PROFILE_TOP_ENTRIES = 15
+
+# Command line: credentials default to these environment variables, and
+# 'watch' re-syncs on this interval while keeping its session and store open
+ENV_JIRA_URL = 'JIRA_URL'
+ENV_JIRA_EMAIL = 'JIRA_EMAIL'
+ENV_JIRA_API_TOKEN = 'JIRA_API_TOKEN'
+DEFAULT_OUTPUT_FILE = 'jira_tasks.xlsx'
+DEFAULT_WATCH_INTERVAL = 300  # seconds
+ACTIONS = ['fetch', 'resync', 'update', 'dry-run', 'replay', 'watch']
+
+# Excel styling shared by the streaming writer and format_excel
+PRIORITY_COLORS = {
+    'Medium': 'FFA500',    # Orange for Medium
+    'High': 'FF0000',      # Red for High
+    'Critical': '8B0000',  # Dark Red for Critical
+    'Low': '0000FF'        # Blue for Low
+}
+HEADER_COLOR = 'D3D3D3'  # Gray color
+
+# Export sinks: rows are handed to every selected sink in batches of this size
+EXPORT_BATCH_SIZE = 1000
+DEFAULT_EXPORT_FORMATS = ['xlsx']
+
+# Export columns: (column name, JSON path within the issue, extraction kind, default).
+# A '[]' in the path walks every item of a list. Kinds:
+#   'value' - the value at the path, or the default when missing or null
+#   'join'  - the values found for each list item joined with ', ', or the default when the list is empty
+#   'flag'  - 'Yes' when the value is truthy, otherwise the default
+TASK_COLUMNS = [
+    ('Task Key', 'key', 'value', ''),
+    ('Summary', 'fields.summary', 'value', ''),
+    ('Status', 'fields.status.name', 'value', ''),
+    ('Category', 'fields.customfield_10035.value', 'value', 'No Category'),  # Category field
+    ('Assignee', 'fields.assignee.displayName', 'value', 'Unassigned'),
+    ('Due Date', 'fields.duedate', 'value', ''),
+    ('Priority', 'fields.priority.name', 'value', 'No Priority'),
+    ('Labels', 'fields.labels[]', 'join', 'No Labels'),
+    ('Created', 'fields.created', 'value', ''),
+    ('Updated', 'fields.updated', 'value', ''),
+    ('Reporter', 'fields.reporter.displayName', 'value', 'No Reporter'),
+    ('Team', 'fields.customfield_10001.name', 'value', 'No Team'),  # Custom field for Team
+    ('Status Category Changed', 'fields.statuscategorychangedate', 'value', 'No Status Category Changed'),
+    ('Parent', 'fields.parent.key', 'value', 'No Parent'),
+    ('Fix Versions', 'fields.fixVersions[].name', 'join', 'No Fix Versions'),
+    ('Resolution', 'fields.resolution.name', 'value', 'Unresolved'),
+    ('DEV Completion', 'fields.customfield_10112', 'value', 'No DEV Completion'),
+    ('QA Completion', 'fields.customfield_10113', 'value', 'No QA Completion'),
+    ('Demo Deployment', 'fields.customfield_10114', 'value', 'No Demo Deployment'),
+    ('Remaining Estimate', 'fields.timeestimate', 'value', 'No Remaining Estimate'),
+    ('Σ Original Estimate', 'fields.aggregatetimeoriginalestimate', 'value', 'No Σ Original Estimate'),
+    ('Affects Versions', 'fields.versions[].name', 'join', 'No Affects Versions'),
+    ('Linked Issues', 'fields.issuelinks[].outwardIssue.key', 'join', 'No Linked Issues'),
+    ('Creator', 'fields.creator.displayName', 'value', 'No Creator'),
+    ('Sub-tasks', 'fields.subtasks[].key', 'join', 'No Sub-tasks'),
+    ('Progress', 'fields.progress.progress', 'value', 'No Progress'),
+    ('Votes', 'fields.votes.votes', 'value', 'No Votes'),
+    ('Log Work', 'fields.worklog.worklogs[].timeSpent', 'join', 'No Work Log'),
+    ('Time Spent', 'fields.timespent', 'value', 'No Time Spent'),
+    ('Resolved', 'fields.resolutiondate', 'value', 'Not Resolved'),
+    ('Work Ratio', 'fields.workratio', 'value', 'No Work Ratio'),
+    ('Watchers', 'fields.watches.watchCount', 'value', 'No Watchers'),
+    ('Images', 'fields.thumbnail.name', 'value', 'No Images'),
+    ('Sprint', 'fields.customfield_10020[].name', 'join', 'No Sprint'),
+    ('Flagged', 'fields.customfield_10021', 'flag', 'No Flag'),
+    ('Original Estimate', 'fields.timeoriginalestimate', 'value', 'No Original Estimate'),
+    ('Description', 'fields.description', 'value', 'No Description'),
+    ('Epic Link', 'fields.customfield_10014', 'value', 'No Epic Link'),
+    ('Time Tracking', 'fields.timetracking.originalEstimate', 'value', 'No Time Tracking'),
+    ('Environment', 'fields.environment', 'value', 'No Environment'),
+    ('Due date', 'fields.duedate', 'value', 'No Due date'),
+]
+
+# Parquet types of the non-text export columns; every other column is stored as text
+PARQUET_COLUMN_TYPES = {
+    'Due Date': 'date',
+    'Created': 'timestamp',
+    'Updated': 'timestamp',
+    'Status Category Changed': 'timestamp',
+    'Remaining Estimate': 'int',
+    'Σ Original Estimate': 'int',
+    'Progress': 'int',
+    'Votes': 'int',
+    'Time Spent': 'int',
+    'Resolved': 'timestamp',
+    'Work Ratio': 'int',
+    'Watchers': 'int',
+    'Original Estimate': 'int',
+    'Due date': 'date',
+}
+
+def compile_path(path):
+    """Compile a dotted path into a getter that returns None when any step is missing or null."""
+    keys = tuple(path.split('.')) if path else ()
+    if not keys:
+        return lambda obj: obj
+    if len(keys) == 1:
+        key = keys[0]
+        def get(obj):
+            try:
+                return obj[key]
+            except (KeyError, TypeError):
+                return None
+        return get
+    def get(obj):
+        try:
+            for key in keys:
+                obj = obj[key]
+            return obj
+        except (KeyError, TypeError):
+            return None
+    return get
+
+def compile_column(path, kind, default):
+    """Compile one column spec entry into an extractor function."""
+    if kind == 'join':
+        list_path, _, item_path = path.partition('[]')
+        get_list = compile_path(list_path)
+        get_item = compile_path(item_path.lstrip('.'))
+        def extract(issue):
+            items = get_list(issue)
+            if not items or not isinstance(items, list):
+                return default
+            return ', '.join(str(value) for value in map(get_item, items) if value is not None)
+        return extract
+
+    get = compile_path(path)
+    if kind == 'flag':
+        return lambda issue: 'Yes' if get(issue) else default
+    if kind == 'value':
+        def extract(issue):
+            value = get(issue)
+            return default if value is None else value
+        return extract
+    raise ValueError(f"Unknown column kind '{kind}' for path '{path}'")
+
+def compile_column_spec(columns):
+    """Compile a column spec once into a function mapping an issue to a row tuple.
+
+    Every column becomes a small closure (see compile_column), so the spec is
+    parsed once instead of per issue. Missing, null or wrongly shaped values
+    produce the column default instead of an error.
+    """
+    extractors = tuple(compile_column(path, kind, default) for _, path, kind, default in columns)
+    def extract_row(issue):
+        return tuple([extract(issue) for extract in extractors])
+    return extract_row
+
+TASK_COLUMN_NAMES = [name for name, _, _, _ in TASK_COLUMNS]
+extract_task_row = compile_column_spec(TASK_COLUMNS)
+
+# Export profiles: the columns exported (and therefore the fields requested) per run.
+# None means every column in TASK_COLUMNS.
+EXPORT_PROFILES = {
+    'minimal': [
+        'Task Key', 'Summary', 'Status', 'Assignee', 'Priority', 'Due Date',
+        'Created', 'Updated', 'Reporter', 'Labels'
+    ],
+    'standard': [name for name in TASK_COLUMN_NAMES if name not in ('Description', 'Log Work')],
+    'full': None
+}
+DEFAULT_EXPORT_PROFILE = 'full'
+
+# Fields that search results embed truncated to their first page:
+# field id -> key of the embedded list, per-issue endpoint under /rest/api/2/issue/{key}/
+PAGED_FIELDS = {
+    'worklog': ('worklogs', 'worklog'),
+    'comment': ('comments', 'comment')
+}
+# 'truncated' keeps paged fields in the search and only re-fetches issues Jira cut short;
+# 'lazy' leaves them out of the search and fetches worklogs per issue with time logged
+EXPAND_MODES = ('truncated', 'lazy')
+DEFAULT_EXPAND_MODE = 'truncated'
+
+# Number of issues fetched with every field to estimate how much projection saved
+SAVINGS_SAMPLE_SIZE = 10
+
+def columns_for_profile(profile):
+    """Return the TASK_COLUMNS entries exported by the given profile."""
+    if profile not in EXPORT_PROFILES:
+        raise ValueError(f"Unknown export profile '{profile}', expected one of {', '.join(EXPORT_PROFILES)}")
+    names = EXPORT_PROFILES[profile]
+    if names is None:
+        return list(TASK_COLUMNS)
+    return [column for column in TASK_COLUMNS if column[0] in names]
+
+def fields_for_columns(columns):
+    """Return the Jira field ids needed to extract the given column spec entries."""
+    field_ids = ['updated']  # Always needed by the local issue store
+    for _, path, _, _ in columns:
+        if path.startswith('fields.'):
+            field_id = path.split('.')[1].partition('[]')[0]
+            if field_id not in field_ids:
+                field_ids.append(field_id)
+    return field_ids
+
+def create_jira_session(email, api_token, pool_size=DEFAULT_MAX_WORKERS):
+    """Create a keep-alive HTTP session shared by all requests of a run."""
+    session = requests.Session()
+    session.auth = HTTPBasicAuth(email, api_token)
+    session.headers.update({'Content-Type': 'application/json'})
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.hooks['response'].append(metrics.observe_response)
+    return session
+
+def ordered_jql(jql):
+    """Append a stable ORDER BY clause unless the query already has one."""
+    if 'order by' in jql.lower():
+        return jql
+    return f"{jql} ORDER BY key ASC"
+
+def jira_base_url(url):
+    """Strip the REST path from a Jira URL, e.g. the search URL, leaving the site base URL."""
+    return url.split('/rest/', 1)[0]
+
+def jql_where(jql):
+    """Return a JQL query without its ORDER BY clause."""
+    match = re.search(r'\border\s+by\b', jql, re.IGNORECASE)
+    return (jql[:match.start()] if match else jql).strip()
+
+def parse_jira_datetime(value):
+    """Parse a Jira timestamp like '2024-01-05T13:07:42.000+0000' into a naive UTC datetime."""
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z').astimezone(timezone.utc).replace(tzinfo=None)
+
+def restrict_jql(jql, clause):
+    """AND an extra clause into a JQL query, keeping any ORDER BY at the end."""
+    match = re.search(r'\border\s+by\b', jql, re.IGNORECASE)
+    where, order = (jql[:match.start()], jql[match.start():]) if match else (jql, '')
+    where = where.strip()
+    restricted = f"({where}) AND {clause}" if where else clause
+    return f"{restricted} {order}".strip()
+
+def issue_sort_key(issue_key):
+    """Split an issue key like 'DEVOPS-42' into ('DEVOPS', 42) for natural ordering."""
+    project, _, number = issue_key.rpartition('-')
+    return project, int(number) if number.isdigit() else 0
+
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+XLSX_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+def _first_sheet_path(archive):
+    """Return the archive path of the first worksheet in an .xlsx file."""
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rel_id = workbook.find(f'{XLSX_NS}sheets/{XLSX_NS}sheet').get(f'{XLSX_REL_NS}id')
+    for rel in ET.fromstring(archive.read('xl/_rels/workbook.xml.rels')):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    raise ValueError("Workbook has no worksheet")
+
+# Raw markup of the worksheet: the root start tag (for its namespace declarations)
+# and the sheetData element, whose prefix (if any) is shared by the row and cell tags
+XLSX_ROOT_TAG = re.compile(rb'<(?:[\w.-]+:)?worksheet\b[^>]*>')
+XLSX_SHEET_DATA = re.compile(rb'<([\w.-]+:)?sheetData\b')
+XLSX_READ_SIZE = 1024 * 1024
+
+def _column_index(ref):
+    """Return the 0-based column of a cell reference like 'AB12'."""
+    index = 0
+    for char in ref:
+        if char.isdigit():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+def _cell_value(cell):
+    """Decode a worksheet <c> element; shared strings come back as ('shared', index)."""
+    cell_type = cell.get('t')
+    if cell_type == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{XLSX_NS}t'))
+    value = cell.find(f'{XLSX_NS}v')
+    if value is None or value.text is None:
+        return None
+    if cell_type == 's':
+        return ('shared', int(value.text))
+    if cell_type == 'b':
+        return value.text == '1'
+    if cell_type in ('str', 'e'):
+        return value.text
+    try:
+        return int(value.text)
+    except ValueError:
+        return float(value.text)
+
+def _iter_sheet_rows(sheet):
+    """Yield the <row> elements of a worksheet stream, parsing as little markup as possible.
+
+    Rows are cut out of the raw bytes and parsed one at a time. Send the
+    number of leading cells still needed (e.g. rows.send(12)) to have every
+    following row truncated after that many cells, so wide text columns to
+    the right of the wanted ones are never parsed.
+    """
+    buffer = b''
+    position = 0
+    end_of_file = False
+    tags = None
+    cell_limit = None
+    while True:
+        if tags is None:
+            sheet_data = XLSX_SHEET_DATA.search(buffer)
+            root = XLSX_ROOT_TAG.search(buffer)
+            if sheet_data and root:
+                prefix = sheet_data.group(1) or b''
+                root_name = root.group(0)[1:].split()[0].rstrip(b'>')
+                tags = (b'<' + prefix + b'row', b'</' + prefix + b'row>', b'<' + prefix + b'c',
+                        root.group(0), b'</' + root_name + b'>')
+                position = sheet_data.end()
+        if tags is not None:
+            row_open, row_close, cell_open, root_start, root_end = tags
+            while True:
+                start = buffer.find(row_open, position)
+                if start < 0 or start + len(row_open) >= len(buffer):
+                    break
+                if buffer[start + len(row_open)] not in b' \t\r\n/>':
+                    position = start + 1  # e.g. <rowBreaks>
+                    continue
+                tag_end = buffer.find(b'>', start)
+                if tag_end < 0:
+                    break
+                if buffer[tag_end - 1] == ord('/'):
+                    end = tag_end + 1  # An empty <row/>
+                    row = buffer[start:end]
+                else:
+                    close = buffer.find(row_close, tag_end)
+                    if close < 0:
+                        break
+                    end = close + len(row_close)
+                    row = buffer[start:end]
+                    if cell_limit is not None:
+                        row = _truncate_row(row, cell_open, row_close, cell_limit)
+                position = end
+                limit = yield ET.fromstring(root_start + row + root_end)[0]
+                if limit is not None:
+                    cell_limit = limit
+        if end_of_file:
+            return
+        chunk = sheet.read(XLSX_READ_SIZE)
+        end_of_file = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+def _truncate_row(row, cell_open, row_close, cell_limit):
+    """Cut a row's markup after its first cell_limit cells."""
+    count = 0
+    position = 0
+    while True:
+        start = row.find(cell_open, position)
+        if start < 0:
+            return row
+        if row[start + len(cell_open)] in b' \t\r\n/>':
+            if count == cell_limit:
+                return row[:start] + row_close
+            count += 1
+        position = start + 1
+
+def _row_values(row, wanted=None):
+    """Return {column index: decoded value} for a row's cells, only those in wanted if given.
+
+    Cells without an 'r' reference sit in the column after the previous cell.
+    """
+    values = {}
+    last = max(wanted) if wanted else None
+    index = -1
+    for cell in row:
+        ref = cell.get('r')
+        index = _column_index(ref) if ref else index + 1
+        if last is not None and index > last:
+            break
+        if wanted is None or index in wanted:
+            values[index] = _cell_value(cell)
+    return values
+
+def read_xlsx_columns(path, columns):
+    """Stream the named columns of the first sheet of an .xlsx file into lists.
+
+    Rows are read one at a time and only the cells up to the last requested
+    column are parsed (see _iter_sheet_rows). Shared strings are resolved at
+    the end by streaming the string table and keeping only the entries that
+    are used. Returns a dict mapping each requested column found in the
+    header row to its values.
+    """
+    shared_refs = []  # (values list, row position, shared string index)
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(_first_sheet_path(archive)) as sheet:
+            rows = _iter_sheet_rows(sheet)
+            header = next(rows, None)
+            if header is None:
+                return {}
+
+            # The header row maps the requested column names to their column indexes
+            found = _row_values(header)
+            strings = _read_shared_strings(archive, {v[1] for v in found.values() if type(v) is tuple})
+            names = {index: strings.get(v[1]) if type(v) is tuple else v for index, v in found.items()}
+            wanted = {index: [] for index, name in names.items() if name in columns}
+            data = {names[index]: values for index, values in wanted.items()}
+            if not wanted:
+                return data
+
+            try:
+                row = rows.send(max(wanted) + 1)
+                while True:
+                    found = _row_values(row, wanted)
+                    for index, values in wanted.items():
+                        value = found.get(index)
+                        if type(value) is tuple:
+                            shared_refs.append((values, len(values), value[1]))
+                        values.append(value)
+                    row = next(rows)
+            except StopIteration:
+                pass
+
+        strings = _read_shared_strings(archive, {index for _, _, index in shared_refs})
+        for values, position, index in shared_refs:
+            values[position] = strings.get(index)
+    return data
+
+def _read_shared_strings(archive, indexes):
+    """Return {index: text} for the requested entries of the shared string table."""
+    strings = {}
+    if not indexes or 'xl/sharedStrings.xml' not in archive.namelist():
+        return strings
+    with archive.open('xl/sharedStrings.xml') as table:
+        index = 0
+        for event, elem in ET.iterparse(table):
+            if elem.tag == f'{XLSX_NS}si':
+                if index in indexes:
+                    strings[index] = ''.join(text.text or '' for text in elem.iter(f'{XLSX_NS}t'))
+                index += 1
+                elem.clear()
+    return strings
+
+class JsonStreamReader:
+    """Pull JSON values one at a time from an iterator of text chunks, buffering only unparsed text."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = ''
+        self.position = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Append the next chunk, dropping what was already parsed; False at the end of the input."""
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it, or '' at the end."""
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'end of input'}'")
+        self.position += 1
+
+    def value(self):
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            if end == len(self.buffer) and self._fill():
+                continue  # A number at the end of the buffer may go on in the next chunk
+            self.position = end
+            return value
+
+def iter_json_array_member(chunks, array_key, header):
+    """Yield the items of one array member of a JSON object as the text chunks arrive.
+
+    The object's other members (e.g. 'total' next to 'issues') are stored in
+    header as they are parsed, so header is complete once the items run out.
+    """
+    reader = JsonStreamReader(chunks)
+    reader.expect('{')
+    while reader.peek() != '}':
+        key = reader.value()
+        reader.expect(':')
+        if key == array_key and reader.peek() == '[':
+            reader.expect('[')
+            while reader.peek() != ']':
+                yield reader.value()
+                if reader.peek() == ',':
+                    reader.expect(',')
+            reader.expect(']')
+        else:
+            header[key] = reader.value()
+        if reader.peek() == ',':
+            reader.expect(',')
+    reader.expect('}')
+
+def iter_response_text(response, count_bytes=None, chunk_size=RESPONSE_CHUNK_SIZE):
+    """Yield a streamed response body as decoded text chunks, passing each chunk's size to count_bytes."""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')()
+    for chunk in response.iter_content(chunk_size):
+        metrics.add_bytes(len(chunk))
+        if count_bytes is not None:
+            count_bytes(len(chunk))
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+def module_available(name):
+    """Return True if an optional dependency is installed, without importing it."""
+    return importlib.util.find_spec(name) is not None
+
+def snapshot_path(excel_file):
+    """Return the sidecar snapshot file used for a workbook."""
+    return f"{os.path.splitext(excel_file)[0]}.snapshot.json"
+
+def sheet_text(value):
+    """Return a cell value as the stripped text the updater reads back from the workbook."""
+    return None if value is None else str(export_value(value)).strip()
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all workers to cap the request rate."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Stop handing out tokens for the given number of seconds (e.g. after a 429)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+def retry_after_seconds(response):
+    """Return the delay requested by a Retry-After header, or None."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def request_with_retry(session, method, url, rate_limiter=None, max_retries=MAX_RETRIES, **kwargs):
+    """Send a request, retrying 429/5xx responses, connection errors and timeouts.
+
+    429 responses honour Retry-After and pause the shared rate limiter; other
+    retries use exponential backoff with full jitter. Requests time out after
+    REQUEST_TIMEOUT unless a timeout is passed. Returns the final response and
+    the number of retries it took.
+    """
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == max_retries:
+                raise
+            delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+            metrics.count_retry()
+            logger.warning(f"{type(e).__name__} on {method} {url}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code not in RETRYABLE_STATUS_CODES or attempt == max_retries:
+            return response, attempt
+
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        metrics.count_retry()
+        if response.status_code == 429:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, BACKOFF_BASE)
+            if rate_limiter is not None:
+                rate_limiter.pause(delay)
+        logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        response.close()  # Hand the connection back to the pool, also for streamed responses
+        time.sleep(delay)
+
+class RunMetrics:
+    """Thread-safe collector for per-phase timings, HTTP statistics and peak memory of a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far (e.g. between benchmark runs)."""
+        with self._lock:
+            self.started_at = time.time()
+            self.phases = {}  # phase name -> {'seconds', 'calls', 'rows'}
+            self.latency_counts = [0] * len(HTTP_LATENCY_BUCKETS)
+            self.latency_sum = 0.0
+            self.status_counts = {}
+            self.bytes_received = 0
+            self.retries = 0
+            self.rate_limited = 0
+
+    def _phase(self, name):
+        return self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0, 'rows': 0})
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of work and add it to the named phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry = self._phase(name)
+                entry['seconds'] += elapsed
+                entry['calls'] += 1
+
+    def add_time(self, name, seconds):
+        """Add work timed elsewhere (e.g. spread over a stream) to the named phase as one call."""
+        with self._lock:
+            entry = self._phase(name)
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+
+    def add_rows(self, name, rows):
+        """Credit processed rows to a phase, for its rows/s rate."""
+        with self._lock:
+            self._phase(name)['rows'] += rows
+
+    def observe_response(self, response, *args, **kwargs):
+        """requests response hook: record latency, status code and body size."""
+        seconds = response.elapsed.total_seconds()
+        size = 0 if kwargs.get('stream') else len(response.content)
+        with self._lock:
+            for index, bound in enumerate(HTTP_LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.latency_counts[index] += 1
+                    break
+            self.latency_sum += seconds
+            self.status_counts[response.status_code] = self.status_counts.get(response.status_code, 0) + 1
+            self.bytes_received += size
+            if response.status_code == 429:
+                self.rate_limited += 1
+
+    def add_bytes(self, size):
+        """Count body bytes read outside the response hook (streamed responses)."""
+        with self._lock:
+            self.bytes_received += size
+
+    def count_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    @staticmethod
+    def peak_rss_bytes():
+        """Peak resident set size of this process, or 0 where it cannot be read."""
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports KiB
+
+    def summary(self):
+        """Return everything recorded as a JSON-serialisable dict."""
+        with self._lock:
+            phases = {}
+            for name, entry in self.phases.items():
+                phases[name] = dict(entry)
+                phases[name]['rows_per_second'] = entry['rows'] / entry['seconds'] if entry['seconds'] else None
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(HTTP_LATENCY_BUCKETS, self.latency_counts):
+                cumulative += count
+                buckets['+Inf' if math.isinf(bound) else str(bound)] = cumulative
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+                'duration_seconds': time.time() - self.started_at,
+                'phases': phases,
+                'http': {
+                    'requests': cumulative,
+                    'status_codes': {str(code): count for code, count in sorted(self.status_counts.items())},
+                    'latency_seconds_sum': self.latency_sum,
+                    'latency_buckets': buckets,
+                    'bytes_received': self.bytes_received,
+                    'retries': self.retries,
+                    'rate_limited': self.rate_limited
+                },
+                'peak_rss_bytes': self.peak_rss_bytes()
+            }
+
+    def write_json(self, path):
+        """Write the summary as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        logger.info(f"Run metrics written to {path}")
+
+    def write_prometheus(self, path):
+        """Write the summary in the Prometheus text format, atomically so scrapers never see half a file."""
+        summary = self.summary()
+        http = summary['http']
+        lines = [
+            '# HELP jira_sync_phase_seconds Time spent in each phase of the last run.',
+            '# TYPE jira_sync_phase_seconds gauge'
+        ]
+        lines += [f'jira_sync_phase_seconds{{phase="{name}"}} {entry["seconds"]}' for name, entry in summary['phases'].items()]
+        lines += ['# HELP jira_sync_phase_rows Rows processed by each phase of the last run.', '# TYPE jira_sync_phase_rows gauge']
+        lines += [f'jira_sync_phase_rows{{phase="{name}"}} {entry["rows"]}' for name, entry in summary['phases'].items()]
+        lines += ['# HELP jira_sync_http_request_duration_seconds Jira API request latency.',
+                  '# TYPE jira_sync_http_request_duration_seconds histogram']
+        lines += [f'jira_sync_http_request_duration_seconds_bucket{{le="{bound}"}} {count}'
+                  for bound, count in http['latency_buckets'].items()]
+        lines += [f'jira_sync_http_request_duration_seconds_sum {http["latency_seconds_sum"]}',
+                  f'jira_sync_http_request_duration_seconds_count {http["requests"]}']
+        lines += ['# HELP jira_sync_http_responses Jira API responses by status code.', '# TYPE jira_sync_http_responses gauge']
+        lines += [f'jira_sync_http_responses{{code="{code}"}} {count}' for code, count in http['status_codes'].items()]
+        for name, value, help_text in (
+            ('jira_sync_http_bytes_received', http['bytes_received'], 'Response body bytes received.'),
+            ('jira_sync_http_retries', http['retries'], 'Requests retried after a 429, 5xx or connection error.'),
+            ('jira_sync_http_rate_limited', http['rate_limited'], 'Responses with status 429.'),
+            ('jira_sync_peak_rss_bytes', summary['peak_rss_bytes'], 'Peak resident set size of the run.'),
+            ('jira_sync_last_run_timestamp_seconds', time.time(), 'When the last run finished.')
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(temp_path, path)
+        logger.info(f"Prometheus metrics written to {path}")
+
+# Shared by every session and phase of the run
+metrics = RunMetrics()
+
+def timed_phase(name):
+    """Decorator recording a method's duration under the named phase; sized results count as rows."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.phase(name):
+                result = func(*args, **kwargs)
+            if hasattr(result, '__len__'):
+                metrics.add_rows(name, len(result))
+            return result
+        return wrapper
+    return decorator
+
+def profile_run(func, profile_file=None, trace_memory=False):
+    """Run func under cProfile and/or tracemalloc when requested and log where the time and memory went."""
+    profiler = cProfile.Profile() if profile_file else None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        return func()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_file)
+            logger.info(f"cProfile stats written to {profile_file} (inspect with python -m pstats)")
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            top_stats = tracemalloc.take_snapshot().statistics('lineno')[:PROFILE_TOP_ENTRIES]
+            tracemalloc.stop()
+            logger.info(f"tracemalloc: {current / 1e6:.1f} MB still allocated, {peak / 1e6:.1f} MB peak")
+            for stat in top_stats:
+                logger.info(f"tracemalloc: {stat}")
+
+class JiraIssueStore:
+    """SQLite-backed local copy of Jira issues keyed by issue key."""
+
+    def __init__(self, db_file=DEFAULT_STORE_FILE):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS issues ('
+            'key TEXT PRIMARY KEY, project TEXT, number INTEGER, updated TEXT, payload TEXT)'
+        )
+        self.conn.execute('CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT)')
+        self.conn.commit()
+
+    def get_state(self, name):
+        """Return a stored sync setting, or None."""
+        row = self.conn.execute('SELECT value FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, name, value):
+        """Store a sync setting."""
+        self.conn.execute('INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)', (name, value))
+        self.conn.commit()
+
+    def get_last_sync(self):
+        """Return the UTC time of the last successful sync, or None."""
+        value = self.get_state('last_sync')
+        return datetime.fromisoformat(value) if value else None
+
+    def set_last_sync(self, synced_at):
+        """Record the UTC time at which the last successful sync started."""
+        self.set_state('last_sync', synced_at.isoformat())
+
+    def _upsert(self, issues, replace_all=False):
+        """Write new and changed issues without committing; return the number written."""
+        # The update is skipped in SQLite itself when 'updated' is unchanged, so nothing is loaded up front
+        condition = '' if replace_all else ' WHERE issues.updated IS NOT excluded.updated'
+        rows = (
+            (issue['key'], *issue_sort_key(issue['key']), (issue.get('fields') or {}).get('updated'), json.dumps(issue))
+            for issue in issues
+        )
+        changes_before = self.conn.total_changes
+        self.conn.executemany(
+            'INSERT INTO issues VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET '
+            'project = excluded.project, number = excluded.number, updated = excluded.updated, '
+            f'payload = excluded.payload{condition}',
+            rows
+        )
+        return self.conn.total_changes - changes_before
+
+    def _reset_seen_keys(self):
+        self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY)')
+        self.conn.execute('DELETE FROM seen_keys')
+
+    def _add_seen_keys(self, keys):
+        self.conn.executemany('INSERT OR IGNORE INTO seen_keys VALUES (?)', ((key,) for key in keys))
+
+    def _delete_unseen(self):
+        return self.conn.execute('DELETE FROM issues WHERE key NOT IN (SELECT key FROM seen_keys)').rowcount
+
+    def store_pages(self, pages, replace_all=False, delete_missing=False):
+        """Write pages of issues as they arrive, in one transaction; return (written, deleted).
+
+        With delete_missing, stored issues absent from the pages are removed
+        afterwards. The seen keys are tracked in a temporary table rather than
+        in memory, and a failed fetch rolls everything back.
+        """
+        written = deleted = 0
+        with self.conn:
+            if delete_missing:
+                self._reset_seen_keys()
+            for page in pages:
+                written += self._upsert(page, replace_all)
+                if delete_missing:
+                    self._add_seen_keys(issue['key'] for issue in page)
+            if delete_missing:
+                deleted = self._delete_unseen()
+        return written, deleted
+
+    def iter_issues(self):
+        """Yield the stored issues in project/number order."""
+        for (payload,) in self.conn.execute('SELECT payload FROM issues ORDER BY project, number'):
+            yield json.loads(payload)
+
+    def close(self):
+        self.conn.close()
+
+def export_value(value):
+    """Flatten a cell value for text-based sinks: nested objects become strings."""
+    return str(value) if isinstance(value, (dict, list)) else value
+
+class ExportSink:
+    """Base class for export sinks.
+
+    A sink is opened with the column names, fed batches of row tuples in that
+    column order as they become available, and closed once at the end.
+    """
+    extension = None
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.rows_written = 0
+
+    def open(self, columns):
+        self.columns = list(columns)
+
+    def write_batch(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        logger.info(f"Wrote {self.rows_written} rows to {self.output_file}")
+
+class ExcelSink(ExportSink):
+    """Styled XLSX written in a single streaming pass with xlsxwriter.
+
+    Applies the header fill, priority colours, borders, alignment and
+    autofilter as rows are written and tracks column widths on the fly.
+    """
+    extension = 'xlsx'
+
+    def open(self, columns):
+        super().open(columns)
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise RuntimeError("The xlsx sink requires xlsxwriter (pip install xlsxwriter)") from None
+        self.workbook = xlsxwriter.Workbook(self.output_file, {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'nan_inf_to_errors': True
+        })
+        self.worksheet = self.workbook.add_worksheet('Sheet1')
+
+        # Center aligned, thin bordered cells; header is bold on a gray fill
+        base_style = {'align': 'center', 'valign': 'vcenter', 'border': 1}
+        self.cell_format = self.workbook.add_format(base_style)
+        header_format = self.workbook.add_format(dict(base_style, bold=True, bg_color=f'#{HEADER_COLOR}', pattern=1))
+        self.priority_formats = {
+            priority: self.workbook.add_format(dict(base_style, bg_color=f'#{color}', pattern=1))
+            for priority, color in PRIORITY_COLORS.items()
+        }
+
+        self.priority_col = self.columns.index('Priority') if 'Priority' in self.columns else None
+        self.widths = [len(column) for column in self.columns]
+        self.worksheet.write_row(0, 0, self.columns, header_format)
+
+    def write_batch(self, rows):
+        worksheet, widths, cell_format = self.worksheet, self.widths, self.cell_format
+        for task in rows:
+            self.rows_written += 1
+            for col_idx, value in enumerate(task):
+                value = export_value(value)
+                if isinstance(value, str) and len(value) > widths[col_idx]:
+                    widths[col_idx] = len(value)
+
+                style = cell_format
+                if col_idx == self.priority_col:
+                    style = self.priority_formats.get(str(value).strip(), cell_format)
+                worksheet.write(self.rows_written, col_idx, value, style)
+
+    def close(self):
+        # Column widths and the autofilter are only serialised on close
+        for col_idx, width in enumerate(self.widths):
+            self.worksheet.set_column(col_idx, col_idx, width + 2)
+        self.worksheet.autofilter(0, 0, self.rows_written, len(self.columns) - 1)
+        self.workbook.close()
+        super().close()
+
+class CsvSink(ExportSink):
+    """Plain UTF-8 CSV with a header row."""
+    extension = 'csv'
+
+    def open(self, columns):
+        super().open(columns)
+        self.file = open(self.output_file, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+
+    def write_batch(self, rows):
+        for row in rows:
+            self.writer.writerow([export_value(value) for value in row])
+            self.rows_written += 1
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+class JsonlSink(ExportSink):
+    """One JSON object per line, keyed by column name."""
+    extension = 'jsonl'
+
+    def open(self, columns):
+        super().open(columns)
+        self.file = open(self.output_file, 'w', encoding='utf-8')
+
+    def write_batch(self, rows):
+        columns = self.columns
+        self.file.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n' for row in rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+class ParquetSink(ExportSink):
+    """Zstd-compressed Parquet written one row group per batch with pyarrow.
+
+    Columns listed in PARQUET_COLUMN_TYPES are stored as integers, dates or
+    UTC timestamps, the rest as text. Placeholders such as 'No Time Spent',
+    and values that do not convert to the column's type, are stored as nulls.
+    """
+    extension = 'parquet'
+    converters = {
+        'string': str,
+        'int': int,
+        'date': date.fromisoformat,
+        'timestamp': parse_jira_datetime
+    }
+
+    def open(self, columns):
+        super().open(columns)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("The parquet sink requires pyarrow (pip install pyarrow)") from None
+        arrow_types = {
+            'string': pyarrow.string(),
+            'int': pyarrow.int64(),
+            'date': pyarrow.date32(),
+            'timestamp': pyarrow.timestamp('ms', tz='UTC')
+        }
+        defaults = {name: default for name, _, _, default in TASK_COLUMNS}
+        kinds = [PARQUET_COLUMN_TYPES.get(column, 'string') for column in self.columns]
+        self.placeholders = [defaults.get(column) for column in self.columns]
+        self.column_converters = [self.converters[kind] for kind in kinds]
+        self.schema = pyarrow.schema([(column, arrow_types[kind]) for column, kind in zip(self.columns, kinds)])
+        self.writer = pyarrow.parquet.ParquetWriter(self.output_file, self.schema, compression='zstd')
+
+    def write_batch(self, rows):
+        import pyarrow  # Already loaded by open()
+        if not rows:
+            return
+        arrays = [
+            pyarrow.array(self.convert_column(field.name, values, placeholder, convert), type=field.type)
+            for values, placeholder, convert, field in zip(zip(*rows), self.placeholders,
+                                                           self.column_converters, self.schema)
+        ]
+        self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        self.rows_written += len(rows)
+
+    @staticmethod
+    def convert_column(column, values, placeholder, convert):
+        """Convert one column of a batch, storing values that do not convert as nulls."""
+        converted = []
+        failed = []
+        for value in values:
+            if value is None or value == placeholder:
+                converted.append(None)
+                continue
+            try:
+                converted.append(convert(value))
+            except (TypeError, ValueError, OverflowError):
+                converted.append(None)
+                failed.append(value)
+        if failed:
+            logger.warning(f"Stored {len(failed)} value(s) of column '{column}' as null in Parquet, "
+                           f"they could not be converted (first: {failed[0]!r})")
+        return converted
+
+    def close(self):
+        self.writer.close()
+        super().close()
+
+EXPORT_SINKS = {sink.extension: sink for sink in (ExcelSink, CsvSink, JsonlSink, ParquetSink)}
+
+def create_sinks(output_file, formats):
+    """Create one sink per requested format, named after output_file with the format's extension."""
+    base = os.path.splitext(output_file)[0]
+    sinks = []
+    for export_format in formats:
+        if export_format not in EXPORT_SINKS:
+            raise ValueError(f"Unknown export format '{export_format}', expected one of {', '.join(EXPORT_SINKS)}")
+        sinks.append(EXPORT_SINKS[export_format](f"{base}.{export_format}"))
+    return sinks
+
+def close_sinks(sinks, discard=False):
+    """Close every sink even if some fail; with discard=True also delete their partly written files.
+
+    Re-raises the first close error unless the files are being discarded anyway.
+    """
+    error = None
+    for sink in sinks:
+        try:
+            sink.close()
+        except Exception as e:
+            logger.warning(f"Could not close {sink.output_file}: {e}")
+            error = error or e
+        if discard and os.path.exists(sink.output_file):
+            os.remove(sink.output_file)
+            logger.info(f"Removed the incomplete {sink.output_file}")
+    if error and not discard:
+        raise error
+
 class JiraExcelFormatter:
-    def __init__(self, jira_url, email, api_token, output_file):
+    def __init__(self, jira_url, email, api_token, output_file, jql=None,
+                 page_size=DEFAULT_PAGE_SIZE, max_workers=DEFAULT_MAX_WORKERS, session=None,
+                 profile=DEFAULT_EXPORT_PROFILE, report_savings=False, snapshot_file=None,
+                 expand_mode=DEFAULT_EXPAND_MODE, expand_keys=(), projects=None, shard_size=None):
         self.jira_url = jira_url
         self.email = email
         self.api_token = api_token
         self.output_file = output_file
+        # The default project filter only applies without --projects; an explicit query is ANDed to each project
+        self.jql = jql if jql is not None else ('' if projects else DEFAULT_JQL)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        # Page prefetching and worklog/comment expansion each use up to max_workers connections at once
+        self.session = session or create_jira_session(email, api_token, 2 * max_workers)
+        self.projects = list(projects or [])
+        self.shard_size = shard_size
 
-    def fetch_jira_data(self):
-        """Fetch data from Jira and return task list"""
-        logger.info("Fetching data from Jira...")
-        try:
-            # Define the list of all field IDs as per your requirements
-            field_ids = [
-                'statuscategorychangedate', 'parent', 'fixVersions', 'statusCategory', 'resolution', 
-                'customfield_10112', 'customfield_10113', 'customfield_10114', 'customfield_10104', 
-                'lastViewed', 'priority', 'labels', 'customfield_10103', 'timeestimate', 
-                'aggregatetimeoriginalestimate', 'versions', 'issuelinks', 'assignee', 'status', 
-                'components', 'issuekey', 'aggregatetimeestimate', 'creator', 'subtasks', 
-                'reporter', 'aggregateprogress', 'progress', 'votes', 'worklog', 'issuetype', 
-                'timespent', 'customfield_10030', 'project', 'customfield_10031', 'customfield_10032', 
-                'customfield_10033', 'aggregatetimespent', 'customfield_10034', 'customfield_10035', 
-                'customfield_10037', 'customfield_10027', 'customfield_10028', 'customfield_10029', 
-                'resolutiondate', 'workratio', 'watches', 'issuerestriction', 'thumbnail', 
-                'created', 'customfield_10020', 'customfield_10021', 'customfield_10022', 
-                'customfield_10023', 'customfield_10024', 'customfield_10025', 'customfield_10026', 
-                'customfield_10016', 'customfield_10017', 'customfield_10018', 'customfield_10019', 
-                'updated', 'timeoriginalestimate', 'description', 'customfield_10010', 
-                'customfield_10011', 'customfield_10012', 'customfield_10013', 'customfield_10014', 
-                'timetracking', 'customfield_10015', 'customfield_10005', 'customfield_10126', 
-                'customfield_10006', 'security', 'customfield_10007', 'customfield_10008', 
-                'attachment', 'customfield_10009', 'summary', 'customfield_10120', 
-                'customfield_10000', 'customfield_10121', 'customfield_10122', 'customfield_10001', 
-                'customfield_10123', 'customfield_10002', 'customfield_10003', 'customfield_10124', 
-                'customfield_10125', 'customfield_10004', 'customfield_10115', 'customfield_10116', 
-                'environment', 'customfield_10117', 'customfield_10118', 'customfield_10119', 
-                'duedate', 'comment'
-            ]
-
-            # Convert the list of field IDs into a comma-separated string
-            fields = ','.join(field_ids)
-
-            # Define the query for the DevOps project, including the custom fields
-            jql_query = {
-                'jql': 'project="DevOps"',  # Modify project key as needed
-                'fields': field_ids
-            }
+        # Only request the fields needed by the exported columns
+        self.columns = columns_for_profile(profile)
+        self.column_names = [name for name, _, _, _ in self.columns]
+        self.field_ids = fields_for_columns(self.columns)
+        # The snapshot only serves 'update', which needs every UPDATE_COLUMNS column in the workbook
+        if snapshot_file and not set(UPDATE_COLUMNS) <= set(self.column_names):
+            logger.info(f"Profile '{profile}' does not export {', '.join(UPDATE_COLUMNS)}, skipping the update snapshot")
+            if os.path.exists(snapshot_file):
+                os.remove(snapshot_file)  # A stale snapshot must not be diffed against a later workbook
+            snapshot_file = None
+        self.snapshot_file = snapshot_file
+        self.extract_row = extract_task_row if profile == 'full' else compile_column_spec(self.columns)
+
+        # Worklogs and comments are completed per issue after the search, see expand_paged_fields
+        if expand_mode not in EXPAND_MODES:
+            raise ValueError(f"Unknown expand mode '{expand_mode}', expected one of {', '.join(EXPAND_MODES)}")
+        self.expand_mode = expand_mode
+        self.expand_keys = set(expand_keys)
+        self.paged_fields = [field_id for field_id in PAGED_FIELDS if field_id in self.field_ids]
+        if expand_mode == 'lazy' and self.paged_fields:
+            self.field_ids = [field_id for field_id in self.field_ids if field_id not in PAGED_FIELDS]
+            if 'worklog' in self.paged_fields and 'timespent' not in self.field_ids:
+                self.field_ids.append('timespent')  # Non-empty only when the issue has worklogs
+        self.report_savings = report_savings
+        self.last_sync_changes = None
+        self.bytes_received = 0
+        self._bytes_lock = threading.Lock()
+
+    def count_bytes(self, size):
+        with self._bytes_lock:
+            self.bytes_received += size
+
+    def fetch_page(self, start_at, jql=None, max_results=None, field_ids=None):
+        """Fetch a single page of search results starting at the given offset.
+
+        The body is streamed and decoded one issue at a time, so the raw
+        response text is never held in memory next to the parsed issues.
+        """
+        jql_query = {
+            'jql': ordered_jql(jql or self.jql),
+            'fields': field_ids or self.field_ids,
+            'startAt': start_at,
+            'maxResults': self.page_size if max_results is None else max_results
+        }
+
+        # Make the API request over the shared session, retrying rate limits and server errors
+        response, _ = request_with_retry(self.session, 'POST', self.jira_url, json=jql_query, stream=True,
+                                         timeout=REQUEST_TIMEOUT)
+
+        # Check for a successful response
+        if response.status_code != 200:
+            logger.error(f"Failed to retrieve tasks at startAt={start_at}, status code: {response.status_code}")
+            logger.error(response.text)
+            raise requests.HTTPError(f"Unexpected status code {response.status_code}", response=response)
+
+        page = {}
+        with response:
+            page['issues'] = list(iter_json_array_member(iter_response_text(response, self.count_bytes), 'issues', page))
+        return page
+
+    def report_projection_savings(self, jql, issue_count, bytes_received):
+        """Estimate and log the bytes saved by requesting only the exported fields.
+
+        A small sample is fetched with every field in JIRA_FIELD_IDS and the
+        per-issue difference is extrapolated to the issues fetched this run.
+        This costs an extra search, so it only runs when report_savings is set.
+        """
+        if not issue_count or set(JIRA_FIELD_IDS) <= set(self.field_ids):
+            return None
+        sample, _ = request_with_retry(self.session, 'POST', self.jira_url, json={
+            'jql': ordered_jql(jql or self.jql),
+            'fields': JIRA_FIELD_IDS,
+            'startAt': 0,
+            'maxResults': SAVINGS_SAMPLE_SIZE
+        })
+        sample_issues = sample.json().get('issues', []) if sample.status_code == 200 else []
+        if not sample_issues:
+            return None
 
-            # Make the API request
-            response = requests.post(
-                self.jira_url,
-                json=jql_query,
-                auth=HTTPBasicAuth(self.email, self.api_token),
-                headers={'Content-Type': 'application/json'}
+        full_estimate = len(sample.content) / len(sample_issues) * issue_count
+        saved = max(int(full_estimate - bytes_received), 0)
+        logger.info(
+            f"Field projection requested {len(self.field_ids)} of {len(JIRA_FIELD_IDS)} fields: "
+            f"received {bytes_received} bytes, saved about {saved} bytes "
+            f"({saved / full_estimate:.0%}) compared to requesting every field"
+        )
+        return saved
+
+    def iter_paginated_pages(self, jql=None):
+        """Yield the pages of a single search in order, fetching at most max_workers pages ahead."""
+        # The first page tells us the total and the page size Jira actually honours
+        first_page = self.fetch_page(0, jql)
+        issues = first_page.get('issues', [])
+        total = first_page.get('total', len(issues))
+        page_size = first_page.get('maxResults') or self.page_size
+        yield issues
+
+        # Fetch the remaining pages in parallel; a new page is only requested when the consumer takes one
+        offsets = iter(range(len(issues), total, page_size) if issues else [])
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque(
+                executor.submit(self.fetch_page, start_at, jql, page_size) for start_at in islice(offsets, self.max_workers)
             )
+            if pending:
+                logger.info(f"Fetching {math.ceil((total - len(issues)) / page_size)} more pages of {page_size} issues "
+                            f"with {self.max_workers} workers...")
+            try:
+                while pending:
+                    page = pending.popleft().result()
+                    start_at = next(offsets, None)
+                    if start_at is not None:
+                        pending.append(executor.submit(self.fetch_page, start_at, jql, page_size))
+                    yield page.get('issues', [])
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def count_issues(self, jql):
+        """Return the number of issues matching a query without fetching any."""
+        return self.fetch_page(0, jql, max_results=0, field_ids=['created']).get('total', 0)
+
+    def created_bound(self, jql, direction):
+        """Return the oldest ('ASC') or newest ('DESC') created time matching a query, or None."""
+        page = self.fetch_page(0, f"{jql} ORDER BY created {direction}", max_results=1, field_ids=['created'])
+        issues = page.get('issues', [])
+        return parse_jira_datetime(issues[0]['fields']['created']) if issues else None
+
+    def split_shard(self, jql, start, end, oldest, newest):
+        """Split one query into disjoint created ranges of at most shard_size issues.
 
-            # Check for a successful response
-            if response.status_code == 200:
-                logger.info("Data successfully retrieved from Jira")
-                tasks = response.json()
-                return tasks['issues']
+        start/end are the shard's own bounds (None means unbounded, so the outer
+        shards never depend on how Jira maps our timestamps to its timezone);
+        oldest/newest bound the data actually inside and pick the split point.
+        """
+        clauses = []
+        if start is not None:
+            clauses.append(f'created >= "{start:%Y/%m/%d %H:%M}"')
+        if end is not None:
+            clauses.append(f'created < "{end:%Y/%m/%d %H:%M}"')
+        shard_jql = restrict_jql(jql, ' AND '.join(clauses)) if clauses else jql
+
+        count = self.count_issues(shard_jql)
+        low, high = start or oldest, end or newest
+        middle = (low + (high - low) / 2).replace(second=0, microsecond=0) if low and high else None
+        if count <= self.shard_size or middle is None or not low < middle < high:
+            return [shard_jql] if count else []
+        return (self.split_shard(jql, start, middle, oldest, newest) +
+                self.split_shard(jql, middle, end, oldest, newest))
+
+    def plan_shards(self, jql=None):
+        """Split a query into disjoint shards: one per project, then by created date range."""
+        where = jql_where(jql or self.jql)
+        base_queries = [restrict_jql(where, f'project = "{project}"') for project in self.projects] or [where]
+        shards = []
+        for base_jql in base_queries:
+            if self.shard_size is None:
+                shards.append(base_jql)
+                continue
+            oldest = self.created_bound(base_jql, 'ASC')
+            newest = self.created_bound(base_jql, 'DESC')
+            if newest is not None:
+                newest += timedelta(minutes=1)  # Make the range cover the newest issue
+            shards.extend(self.split_shard(base_jql, None, None, oldest, newest))
+        logger.info(f"Split the query into {len(shards)} shards")
+        return shards
+
+    def iter_shard_pages(self, shard_jql):
+        """Yield one shard's pages in order; a failed page is retried from where the shard left off."""
+        fetched = 0
+        failures = 0
+        while True:
+            try:
+                page = self.fetch_page(fetched, shard_jql)
+            except Exception as e:
+                if failures == SHARD_RETRIES:
+                    raise
+                delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** failures))
+                failures += 1
+                logger.warning(f"Shard '{shard_jql}' failed at startAt={fetched} ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            page_issues = page.get('issues', [])
+            fetched += len(page_issues)
+            if page_issues:
+                yield page_issues
+            if not page_issues or fetched >= page.get('total', 0):
+                return
+
+    def iter_sharded_pages(self, jql=None):
+        """Yield pages from all shards as they arrive, fetching shards in parallel.
+
+        Pages pass through a queue of max_workers entries: workers block while
+        it is full, so a slow consumer holds back the fetch instead of letting
+        pages pile up in memory. Issues that move between shards mid-fetch can
+        appear twice.
+        """
+        shards = self.plan_shards(jql)
+        if len(shards) == 1:
+            # Nothing to spread over workers: prefetch the shard's pages concurrently instead
+            yield from self.iter_paginated_pages(shards[0])
+            return
+        pages = queue.Queue(maxsize=self.max_workers)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def fetch_into_queue(shard_jql):
+            if stop.is_set():
+                return  # Another shard failed or the consumer stopped
+            try:
+                for page in self.iter_shard_pages(shard_jql):
+                    if not put(page):
+                        return
+                put(None)  # This shard is done
+            except Exception as e:
+                put(e)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for shard_jql in shards:
+                executor.submit(fetch_into_queue, shard_jql)
+            try:
+                done = 0
+                while done < len(shards):
+                    item = pages.get()
+                    if item is None:
+                        done += 1
+                        logger.info(f"Shard {done}/{len(shards)} done")
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def iter_issue_pages(self, jql=None):
+        """Yield pages of issues, with worklogs/comments completed, as they arrive from Jira.
+
+        This is the streaming form of fetch_jira_data: only a bounded number of
+        pages is held at any time.
+        """
+        logger.info("Fetching data from Jira...")
+        try:
+            bytes_before = self.bytes_received
+            count = 0
+            if self.projects or self.shard_size is not None:
+                pages = self.iter_sharded_pages(jql)
             else:
-                logger.error(f"Failed to retrieve tasks, status code: {response.status_code}")
-                logger.error(response.text)
-                sys.exit(1)
+                pages = self.iter_paginated_pages(jql)
+            for page in pages:
+                self.expand_paged_fields(page)
+                count += len(page)
+                metrics.add_rows('fetch', len(page))
+                yield page
+
+            logger.info(f"Data successfully retrieved from Jira: {count} issues")
 
         except Exception as e:
             logger.exception("An error occurred while fetching data from Jira")
             sys.exit(1)
 
+        # The report is informational: a failed sample must not fail (or roll back) a finished fetch
+        if self.report_savings:
+            try:
+                self.report_projection_savings(jql, count, self.bytes_received - bytes_before)
+            except Exception as e:
+                logger.warning(f"Could not estimate the field projection savings: {e}")
+
+    def fetch_jira_data(self, jql=None):
+        """Fetch all issues from Jira and return them in search order"""
+        with metrics.phase('fetch'):
+            issues = [issue for page in self.iter_issue_pages(jql) for issue in page]
+        if self.projects or self.shard_size is not None:
+            # Shards arrive in completion order and may overlap if an issue moved during the fetch
+            merged = {issue['key']: issue for issue in issues}
+            issues = [merged[key] for key in sorted(merged, key=issue_sort_key)]
+        return issues
+
+    def needs_expansion(self, issue, field_id):
+        """Return True if the issue's worklogs/comments must be fetched from the per-issue endpoint."""
+        if issue['key'] in self.expand_keys:
+            return True
+        fields = issue.get('fields') or {}
+        if self.expand_mode == 'lazy':
+            # Only worklogs have a cheap hint in the search results
+            return field_id == 'worklog' and bool(fields.get('timespent'))
+        embedded = fields.get(field_id) or {}
+        list_key, _ = PAGED_FIELDS[field_id]
+        return embedded.get('total', 0) > len(embedded.get(list_key) or [])
+
+    def fetch_paged_field(self, issue_key, field_id):
+        """Fetch every page of an issue's worklogs or comments and return them in the search-result shape."""
+        list_key, endpoint = PAGED_FIELDS[field_id]
+        url = f"{jira_base_url(self.jira_url)}/rest/api/2/issue/{issue_key}/{endpoint}"
+        items = []
+        total = None
+        while total is None or len(items) < total:
+            response, _ = request_with_retry(
+                self.session, 'GET', url, params={'startAt': len(items), 'maxResults': self.page_size}
+            )
+            if response.status_code != 200:
+                logger.error(f"Failed to retrieve {field_id} for {issue_key}, status code: {response.status_code}")
+                raise requests.HTTPError(f"Unexpected status code {response.status_code}", response=response)
+            self.count_bytes(len(response.content))
+            page = response.json()
+            page_items = page.get(list_key, [])
+            items.extend(page_items)
+            total = page.get('total', len(items))
+            if not page_items:
+                break
+        return {'startAt': 0, 'maxResults': len(items), 'total': len(items), list_key: items}
+
+    def expand_paged_fields(self, issues):
+        """Complete worklogs/comments for the issues that need it, fetching them concurrently."""
+        if not self.paged_fields:
+            return issues
+        jobs = [
+            (issue, field_id) for issue in issues for field_id in self.paged_fields
+            if self.needs_expansion(issue, field_id)
+        ]
+        if not jobs:
+            return issues
+
+        logger.info(f"Expanding {len(jobs)} worklog/comment lists from the per-issue endpoints...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            expanded = executor.map(lambda job: self.fetch_paged_field(job[0]['key'], job[1]), jobs)
+            for (issue, field_id), value in zip(jobs, expanded):
+                issue.setdefault('fields', {})[field_id] = value
+        return issues
+
+    def sync_issue_store(self, store, full_resync=False):
+        """Bring the local issue store up to date and return it.
+
+        Incremental runs only ask Jira for issues updated since the last sync.
+        A full resync (or a first run) re-reads everything and drops issues
+        that no longer match the query, which is how deletions are handled.
+        """
+        sync_started = datetime.now(timezone.utc)
+        last_sync = None if full_resync else store.get_last_sync()
+
+        # Stored payloads only hold the projected fields, so a new field set needs a full reload
+        field_signature = ','.join(sorted(self.field_ids))
+        fields_changed = store.get_state('fields') != field_signature
+        if fields_changed and last_sync is not None:
+            logger.info("Requested fields changed since the last sync, running a full resync instead")
+            last_sync = None
+
+        # Incremental syncs never see issues of a previous query again, so a new query also needs one
+        query_signature = json.dumps({'jql': jql_where(self.jql), 'projects': sorted(self.projects)})
+        if store.get_state('query') != query_signature and last_sync is not None:
+            logger.info("The query changed since the last sync, running a full resync instead")
+            last_sync = None
+
+        # Pages are written to the store as they arrive, so the fetch never holds the whole result
+        if last_sync is None:
+            logger.info("Running a full resync of the local issue store...")
+            with metrics.phase('fetch'):
+                written, deleted = store.store_pages(
+                    self.iter_issue_pages(), replace_all=fields_changed, delete_missing=True
+                )
+            logger.info(f"Full resync stored {written} changed issues and removed {deleted} deleted issues")
+            self.last_sync_changes = written + deleted
+        else:
+            # Relative JQL dates are evaluated by Jira itself, so no timezone conversion is needed
+            minutes = math.ceil((sync_started - last_sync).total_seconds() / 60) + SYNC_OVERLAP_MINUTES
+            logger.info(f"Fetching issues updated since {last_sync.isoformat()}...")
+            with metrics.phase('fetch'):
+                written, _ = store.store_pages(self.iter_issue_pages(restrict_jql(self.jql, f'updated >= "-{minutes}m"')))
+            logger.info(f"Incremental sync stored {written} changed issues")
+            self.last_sync_changes = written
+
+        store.set_state('fields', field_signature)
+        store.set_state('query', query_signature)
+        store.set_last_sync(sync_started)
+        return store
+
+    def snapshot_rows(self, rows):
+        """Pass rows through unchanged while streaming their SNAPSHOT_COLUMNS values to the snapshot file.
+
+        The values are stored as the text the workbook holds, so 'update' can
+        diff the sheet against them. The file is written under a temporary name
+        and only replaces the old snapshot once every row has gone through.
+        """
+        key_index = self.column_names.index('Task Key')
+        indices = [(column, self.column_names.index(column)) for column in SNAPSHOT_COLUMNS]
+        temp_file = f"{self.snapshot_file}.tmp"
+        count = 0
+        completed = False
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write('{')
+                for row in rows:
+                    values = {column: sheet_text(row[index]) for column, index in indices}
+                    f.write(f"{', ' if count else ''}{json.dumps(row[key_index])}: {json.dumps(values)}")
+                    count += 1
+                    yield row
+                f.write('}')
+            os.replace(temp_file, self.snapshot_file)
+            completed = True
+        finally:
+            # A failed or abandoned export keeps the previous snapshot and leaves no partial file behind
+            if not completed and os.path.exists(temp_file):
+                os.remove(temp_file)
+        logger.info(f"Snapshot of {count} issues saved to {self.snapshot_file}")
+
+    @timed_phase('prepare')
     def prepare_task_list(self, issues):
-        """Prepare task list for Excel"""
+        """Prepare task list for Excel as row tuples in self.column_names order"""
         logger.info("Preparing task list for Excel...")
-        task_list = []
-        for issue in issues:
-            task_list.append({
-                'Task Key': issue['key'],
-                'Summary': issue['fields'].get('summary', ''),
-                'Status': issue['fields']['status']['name'],
-                'Category': issue['fields'].get('customfield_10035', {}).get('value', 'No Category'),  # Category field
-                'Assignee': issue['fields']['assignee']['displayName'] if issue['fields'].get('assignee') else 'Unassigned',
-                'Due Date': issue['fields'].get('duedate', ''),
-                'Priority': issue['fields']['priority']['name'] if 'priority' in issue['fields'] else 'No Priority',
-                'Labels': ', '.join(issue['fields'].get('labels', [])) if issue['fields'].get('labels') else 'No Labels',
-                'Created': issue['fields'].get('created', ''),
-                'Updated': issue['fields'].get('updated', ''),
-                'Reporter': issue['fields']['reporter']['displayName'] if issue['fields'].get('reporter') else 'No Reporter',
-                'Team': issue['fields'].get('customfield_10001', {}).get('name', 'No Team'),  # Custom field for Team
-    
-                # Newly added fields
-                'Status Category Changed': issue['fields'].get('statuscategorychangedate', 'No Status Category Changed'),
-                'Parent': issue['fields'].get('parent', {}).get('key', 'No Parent'),
-                'Fix Versions': ', '.join([ver['name'] for ver in issue['fields'].get('fixVersions', [])]) if issue['fields'].get('fixVersions') else 'No Fix Versions',
-                
-                # Check if 'resolution' exists and is not None
-                'Resolution': issue['fields'].get('resolution', {}).get('name', 'Unresolved') if issue['fields'].get('resolution') else 'Unresolved',
-    
-                'DEV Completion': issue['fields'].get('customfield_10112', 'No DEV Completion'),
-                'QA Completion': issue['fields'].get('customfield_10113', 'No QA Completion'),
-                'Demo Deployment': issue['fields'].get('customfield_10114', 'No Demo Deployment'),
-                'Remaining Estimate': issue['fields'].get('timeestimate', 'No Remaining Estimate'),
-                'Σ Original Estimate': issue['fields'].get('aggregatetimeoriginalestimate', 'No Σ Original Estimate'),
-                'Affects Versions': ', '.join([ver['name'] for ver in issue['fields'].get('versions', [])]) if issue['fields'].get('versions') else 'No Affects Versions',
-                'Linked Issues': ', '.join([link['outwardIssue']['key'] for link in issue['fields'].get('issuelinks', []) if 'outwardIssue' in link]) if issue['fields'].get('issuelinks') else 'No Linked Issues',
-                'Creator': issue['fields'].get('creator', {}).get('displayName', 'No Creator'),
-                'Sub-tasks': ', '.join([sub['key'] for sub in issue['fields'].get('subtasks', [])]) if issue['fields'].get('subtasks') else 'No Sub-tasks',
-                'Progress': issue['fields'].get('progress', {}).get('progress', 'No Progress'),
-                'Votes': issue['fields'].get('votes', {}).get('votes', 'No Votes'),
-                'Log Work': ', '.join([log['timeSpent'] for log in issue['fields'].get('worklog', {}).get('worklogs', [])]) if issue['fields'].get('worklog') else 'No Work Log',
-                'Time Spent': issue['fields'].get('timespent', 'No Time Spent'),
-                'Resolved': issue['fields'].get('resolutiondate', 'Not Resolved'),
-                'Work Ratio': issue['fields'].get('workratio', 'No Work Ratio'),
-                'Watchers': issue['fields'].get('watches', {}).get('watchCount', 'No Watchers'),
-                'Images': issue['fields'].get('thumbnail', {}).get('name', 'No Images'),
-                'Sprint': ', '.join([sprint['name'] for sprint in issue['fields'].get('customfield_10020', [])]) if issue['fields'].get('customfield_10020') else 'No Sprint',
-                'Flagged': 'Yes' if issue['fields'].get('customfield_10021') else 'No Flag',
-                'Original Estimate': issue['fields'].get('timeoriginalestimate', 'No Original Estimate'),
-                'Description': issue['fields'].get('description', 'No Description'),
-                'Epic Link': issue['fields'].get('customfield_10014', 'No Epic Link'),
-                'Time Tracking': issue['fields'].get('timetracking', {}).get('originalEstimate', 'No Time Tracking'),
-                'Environment': issue['fields'].get('environment', 'No Environment'),
-                'Due date': issue['fields'].get('duedate', 'No Due date'),
-            })
-        return task_list
-
-    def save_to_excel(self, task_list):
+        return [self.extract_row(issue) for issue in issues]
+
+    def iter_task_rows(self, issues):
+        """Lazily turn issues into row tuples, for streaming straight into the export sinks.
+
+        The extraction time is recorded under the 'prepare' phase, which on
+        this path runs inside the consumer's 'save' phase.
+        """
+        extract_row = self.extract_row
+        seconds = 0.0
+        count = 0
+        try:
+            for issue in issues:
+                start = time.perf_counter()
+                row = extract_row(issue)
+                seconds += time.perf_counter() - start
+                count += 1
+                yield row
+        finally:
+            metrics.add_time('prepare', seconds)
+            metrics.add_rows('prepare', count)
+
+    def save_to_excel(self, task_list, columns=None):
         """Save task list to an Excel file with formatting"""
+        import pandas as pd
         try:
             # Prepare data for Excel
             logger.info("Preparing data for Excel...")
-            df = pd.DataFrame(task_list)
+            df = pd.DataFrame(task_list, columns=columns or self.column_names)
 
             # Save DataFrame to Excel
             logger.info(f"Saving data to {self.output_file}...")
-            df.to_excel(self.output_file, index=False)
+            with metrics.phase('save'):
+                df.to_excel(self.output_file, index=False)
+            metrics.add_rows('save', len(df))
 
         except Exception as e:
             logger.exception("An error occurred while saving data to Excel")
             sys.exit(1)
             
+    @timed_phase('format')
     def format_excel(self):
         """Format the Excel file with priority colors, alignment, borders, filters, and gray header row"""
+        from openpyxl import load_workbook
+        from openpyxl.styles import Alignment, Border, Side, PatternFill
         try:
             logger.info("Formatting Excel file...")
     
@@ -169,32 +1719,43 @@ class JiraExcelFormatter:
     
             # Define color fills for different priorities
             priority_colors = {
-                'Medium': PatternFill(start_color='FFA500', end_color='FFA500', fill_type='solid'),  # Orange for Medium
-                'High': PatternFill(start_color='FF0000', end_color='FF0000', fill_type='solid'),    # Red for High
-                'Critical': PatternFill(start_color='8B0000', end_color='8B0000', fill_type='solid'),  # Dark Red for Critical
-                'Low': PatternFill(start_color='0000FF', end_color='0000FF', fill_type='solid')      # Blue for Low
+                priority: PatternFill(start_color=color, end_color=color, fill_type='solid')
+                for priority, color in PRIORITY_COLORS.items()
             }
     
             # Define gray color for header row
-            header_fill = PatternFill(start_color='D3D3D3', end_color='D3D3D3', fill_type='solid')  # Gray color
+            header_fill = PatternFill(start_color=HEADER_COLOR, end_color=HEADER_COLOR, fill_type='solid')
     
+            # Locate the priority column from the header, since profiles export different columns
+            header_values = [cell.value for cell in ws[1]]
+            priority_col = header_values.index('Priority') if 'Priority' in header_values else 6
+
+            # Per-row messages are only built when debug logging is on; the loop runs once per issue
+            debug = logger.isEnabledFor(logging.DEBUG)
+            colored_rows = 0
+
             # Apply center alignment, borders, and conditional formatting for priorities
             for row in ws.iter_rows(min_row=2, max_row=ws.max_row):  # Iterate over rows, starting from the second row to skip header
-                priority_cell = row[6]  # Assuming column G is the priority column
+                priority_cell = row[priority_col]
                 priority_value = str(priority_cell.value).strip()  # Ensure that we are stripping whitespace or extra characters
     
                 # Print for debugging: Check what values are being read
-                logger.debug(f"Row {priority_cell.row}: Priority value = '{priority_value}'")
+                if debug:
+                    logger.debug("Row %s: Priority value = '%s'", priority_cell.row, priority_value)
     
                 # Center align cells and apply borders
                 for cell in row:
                     cell.alignment = Alignment(horizontal='center', vertical='center')  # Center align cells
                     cell.border = thin_border  # Apply border to each cell
     
-                # Apply color fill only in the "Priority" column (column G)
+                # Apply color fill only in the "Priority" column
                 if priority_value in priority_colors:
-                    logger.info(f"Applying color for Priority '{priority_value}' at row {priority_cell.row}")
+                    if debug:
+                        logger.debug("Applying color for Priority '%s' at row %s", priority_value, priority_cell.row)
                     priority_cell.fill = priority_colors[priority_value]  # Apply color based on priority
+                    colored_rows += 1
+            logger.info(f"Applied priority colors to {colored_rows} rows")
+            metrics.add_rows('format', ws.max_row - 1)
     
             # Apply gray color and border to the header row (first row)
             logger.info("Applying gray color to the header row...")
@@ -228,169 +1789,642 @@ class JiraExcelFormatter:
             logger.exception("An error occurred while formatting the Excel file")
             sys.exit(1)
 
+    def write_formatted_excel(self, task_list, columns=None):
+        """Write and format the Excel file in a single streaming pass.
+
+        Produces the same layout as save_to_excel followed by format_excel, but
+        rows are styled as they are written (xlsxwriter constant-memory mode) and
+        column widths are tracked on the fly instead of rescanning the sheet.
+        """
+        logger.info(f"Streaming data to {self.output_file}...")
+        self.write_sinks([ExcelSink(self.output_file)], task_list, columns)
+
+    def export_to_excel(self, task_list, columns=None):
+        """Export the task list using the streaming writer when xlsxwriter is installed."""
+        if module_available('xlsxwriter'):
+            self.write_formatted_excel(task_list, columns or self.column_names)
+        else:
+            logger.info("xlsxwriter is not installed, falling back to pandas + openpyxl formatting")
+            self.save_to_excel(task_list, columns or self.column_names)
+            self.format_excel()
+
+    def write_sinks(self, sinks, rows, columns=None):
+        """Feed rows to every sink in batches, so one pass produces all outputs."""
+        try:
+            with metrics.phase('save'):
+                opened = []
+                failed = True
+                try:
+                    for sink in sinks:
+                        sink.open(columns or self.column_names)
+                        opened.append(sink)
+                    batch = []
+                    for row in rows:
+                        batch.append(row)
+                        if len(batch) >= EXPORT_BATCH_SIZE:
+                            for sink in sinks:
+                                sink.write_batch(batch)
+                            batch = []
+                    for sink in sinks:
+                        sink.write_batch(batch)
+                    failed = False
+                finally:
+                    # Close every opened sink, and drop the partial outputs if any sink failed
+                    close_sinks(opened, discard=failed)
+            metrics.add_rows('save', sinks[0].rows_written if sinks else 0)
+
+        except Exception as e:
+            logger.exception("An error occurred while writing the export files")
+            sys.exit(1)
+
+    def export(self, task_list, formats=DEFAULT_EXPORT_FORMATS):
+        """Export the task rows (a list or any iterable) to every requested format ('xlsx', 'csv', 'jsonl', 'parquet')."""
+        formats = list(formats)
+        if 'xlsx' in formats and not module_available('xlsxwriter'):
+            # The pandas + openpyxl fallback cannot stream, so it runs on its own over a materialised list
+            task_list = list(task_list)
+            formats.remove('xlsx')
+            self.export_to_excel(task_list)
+        if formats:
+            self.write_sinks(create_sinks(self.output_file, formats), task_list)
+
+def skipped_result(issue_key, reason):
+    """Build the result record for a row that was not sent to Jira."""
+    return {'issue_key': issue_key, 'status': 'skipped', 'status_code': None, 'retries': 0, 'error': reason}
+
+class AssigneeResolver:
+    """Resolve assignee display names to Jira account IDs with caching.
+
+    Lookups go through an in-memory LRU cache and an optional JSON cache file
+    whose entries expire after ttl seconds. Names Jira does not know are
+    cached as None so they are not looked up again.
+    """
+
+    def __init__(self, jira_url, session, max_workers=DEFAULT_MAX_WORKERS, cache_size=ASSIGNEE_CACHE_SIZE,
+                 cache_file=None, ttl=ASSIGNEE_CACHE_TTL, rate_limiter=None):
+        self.jira_url = jira_url
+        self.session = session
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.rate_limiter = rate_limiter
+        self.cache = OrderedDict()  # display name -> (account ID or None, cached at)
+        self._lock = threading.Lock()
+        self.load_cache()
+
+    def load_cache(self):
+        """Load unexpired entries from the cache file, if one is configured."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        now = time.time()
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                entries = json.load(f)
+            # Checked in full before anything is cached, so a malformed file is ignored as a whole
+            fresh = [(name, account_id, cached_at) for name, (account_id, cached_at) in entries.items()
+                     if now - cached_at < self.ttl]
+        except (OSError, ValueError, TypeError, AttributeError):
+            logger.warning(f"Ignoring unreadable assignee cache file: {self.cache_file}")
+            return
+        for name, account_id, cached_at in fresh:
+            self._remember(name, account_id, cached_at)
+        logger.info(f"Loaded {len(self.cache)} cached assignees from {self.cache_file}")
+
+    def save_cache(self):
+        """Write the cached entries back to the cache file, if one is configured."""
+        if not self.cache_file:
+            return
+        with self._lock:
+            entries = {name: list(entry) for name, entry in self.cache.items()}
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+
+    def _remember(self, name, account_id, cached_at=None):
+        with self._lock:
+            self.cache[name] = (account_id, cached_at or time.time())
+            self.cache.move_to_end(name)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _cached(self, name):
+        """Return (hit, account ID) for a name, dropping the entry if it has expired."""
+        with self._lock:
+            entry = self.cache.get(name)
+            if entry is None:
+                return False, None
+            if time.time() - entry[1] >= self.ttl:
+                del self.cache[name]
+                return False, None
+            self.cache.move_to_end(name)
+            return True, entry[0]
+
+    def search_account_id(self, display_name):
+        """Look up the account ID for a display name; None if Jira has no match."""
+        response, _ = request_with_retry(
+            self.session, 'GET', f"{self.jira_url}/rest/api/3/user/search",
+            rate_limiter=self.rate_limiter, params={'query': display_name}
+        )
+        if response.status_code != 200:
+            logger.error(f"Failed to retrieve user account ID for {display_name}, status code: {response.status_code}")
+            logger.error(response.text)
+            raise requests.HTTPError(f"Unexpected status code {response.status_code}", response=response)
+
+        users = response.json()
+        if not users:
+            logger.error(f"Assignee '{display_name}' not found in Jira.")
+            return None
+        # Return the first match (you can refine the search logic if needed)
+        return users[0]['accountId']
+
+    def resolve(self, display_name):
+        """Return the account ID for a display name, or None if it cannot be resolved."""
+        hit, account_id = self._cached(display_name)
+        if hit:
+            return account_id
+        try:
+            account_id = self.search_account_id(display_name)
+        except Exception as e:
+            # Transient failures are not cached so the next run retries them
+            logger.exception(f"An error occurred while fetching account ID for {display_name}")
+            return None
+        self._remember(display_name, account_id)
+        return account_id
+
+    @timed_phase('resolve')
+    def resolve_all(self, display_names):
+        """Resolve every distinct display name up front, concurrently; return a name -> ID dict."""
+        names = list(dict.fromkeys(name for name in display_names if name))
+        resolved = {}
+        missing = []
+        for name in names:
+            hit, account_id = self._cached(name)
+            if hit:
+                resolved[name] = account_id
+            else:
+                missing.append(name)
+
+        if missing:
+            logger.info(f"Resolving {len(missing)} of {len(names)} distinct assignees with {self.max_workers} workers...")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                resolved.update(zip(missing, executor.map(self.resolve, missing)))
+            self.save_cache()
+        return resolved
+
 class JiraUpdaterFromExcel:
-    def __init__(self, jira_url, email, api_token, excel_file):
+    def __init__(self, jira_url, email, api_token, excel_file, max_workers=DEFAULT_MAX_WORKERS,
+                 session=None, assignee_cache_file=None, rate=DEFAULT_UPDATE_RATE, burst=DEFAULT_UPDATE_BURST,
+                 report_file=None, snapshot_file=None, dry_run=False, plan_file=None):
         self.jira_url = jira_url
         self.email = email
         self.api_token = api_token
         self.excel_file = excel_file
+        self.max_workers = max_workers
+        self.session = session or create_jira_session(email, api_token, max_workers)
+        self.rate_limiter = TokenBucket(rate, burst)
+        self.report_file = report_file
+        self.snapshot_file = snapshot_file
+        self.dry_run = dry_run
+        self.plan_file = plan_file
+        self.description_template = None
+        self.snapshot = self.load_snapshot()
+        self.sheet_values = {}  # Issue key -> SNAPSHOT_COLUMNS values of the rows being sent
+        self.assignee_resolver = AssigneeResolver(
+            jira_url, self.session, max_workers, cache_file=assignee_cache_file, rate_limiter=self.rate_limiter
+        )
 
-    def read_excel(self):
-        """Read the Excel file and return the data as a DataFrame."""
+    @timed_phase('read')
+    def read_update_columns(self, columns=UPDATE_COLUMNS):
+        """Stream only the given columns from the workbook into a DataFrame."""
+        import pandas as pd
         try:
-            logger.info(f"Reading Excel file: {self.excel_file}")
-            df = pd.read_excel(self.excel_file)
-            return df
+            logger.info(f"Reading columns {', '.join(columns)} from Excel file: {self.excel_file}")
+            data = read_xlsx_columns(self.excel_file, columns)
+            missing = [column for column in columns if column not in data]
+            if missing:
+                raise ValueError(f"The workbook has no {', '.join(missing)} column")
+            return pd.DataFrame(data, columns=list(columns))
         except Exception as e:
             logger.exception(f"An error occurred while reading the Excel file: {self.excel_file}")
             sys.exit(1)
 
-    def get_assignee_account_id(self, display_name):
-        """Fetch the Jira account ID for the assignee by display name."""
-        url = f"{self.jira_url}/rest/api/3/user/search?query={display_name}"
-        try:
-            response = requests.get(
-                url,
-                auth=HTTPBasicAuth(self.email, self.api_token),
-                headers={'Content-Type': 'application/json'}
-            )
+    def load_snapshot(self):
+        """Load the export-time snapshot of the sheet values, or an empty dict if there is none."""
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            logger.info("No snapshot found, every valid row will be sent to Jira")
+            return {}
+        with open(self.snapshot_file, encoding='utf-8') as f:
+            return json.load(f)
 
-            if response.status_code == 200:
-                users = response.json()
-                if users:
-                    # Return the first match (you can refine the search logic if needed)
-                    return users[0]['accountId']
-                else:
-                    logger.error(f"Assignee '{display_name}' not found in Jira.")
-                    return None
-            else:
-                logger.error(f"Failed to retrieve user account ID for {display_name}, status code: {response.status_code}")
-                logger.error(response.text)
-                return None
-        except Exception as e:
-            logger.exception(f"An error occurred while fetching account ID for {display_name}")
-            return None
+    def save_snapshot(self, results, jobs):
+        """Record the sheet values of successfully updated rows so the next run does not resend them."""
+        if not self.snapshot_file:
+            return
+        succeeded = {result['issue_key'] for result in results if result['status'] == 'succeeded'}
+        for issue_key, _ in jobs:
+            if issue_key in succeeded and issue_key in self.sheet_values:
+                self.snapshot[issue_key] = self.sheet_values[issue_key]
+        with open(self.snapshot_file, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot, f)
+
+    def changed_columns(self, issue_key, values):
+        """Return the SNAPSHOT_COLUMNS whose sheet value differs from the snapshot (all of them without one)."""
+        previous = self.snapshot.get(issue_key)
+        if previous is None:
+            return list(SNAPSHOT_COLUMNS)
+        return [column for column in SNAPSHOT_COLUMNS if values[column] != previous.get(column)]
 
     def update_jira_issue(self, issue_key, update_data):
-        """Update the Jira issue using the Jira REST API."""
+        """Update the Jira issue using the Jira REST API and return a result record."""
         url = f"{self.jira_url}/rest/api/2/issue/{issue_key}"
+        result = {'issue_key': issue_key, 'status': 'failed', 'status_code': None, 'retries': 0, 'error': None}
 
         try:
-            headers = {
-                'Content-Type': 'application/json'
-            }
-
-            # Make the API request to update the Jira issue
-            response = requests.put(
-                url,
-                json=update_data,
-                auth=HTTPBasicAuth(self.email, self.api_token),
-                headers=headers
+            # Make the API request to update the Jira issue, retrying rate limits and server errors
+            response, retries = request_with_retry(
+                self.session, 'PUT', url, rate_limiter=self.rate_limiter, json=update_data
             )
+            result['status_code'] = response.status_code
+            result['retries'] = retries
 
             if response.status_code == 204:
-                logger.info(f"Issue {issue_key} updated successfully.")
+                result['status'] = 'succeeded'
+                logger.debug("Issue %s updated successfully.", issue_key)
             else:
+                result['error'] = response.text
                 logger.error(f"Failed to update issue {issue_key}, status code: {response.status_code}")
                 logger.error(response.text)
 
         except Exception as e:
+            result['error'] = str(e)
             logger.exception(f"An error occurred while updating Jira issue {issue_key}")
+        return result
 
-    def sanitize_data(self, value):
-        """Helper function to sanitize data before updating Jira."""
-        return str(value).strip() if value else None
+    @timed_phase('update')
+    def run_updates(self, jobs):
+        """Apply (issue key, update data) jobs concurrently and return their results in order."""
+        logger.info(f"Updating {len(jobs)} issues with {self.max_workers} workers...")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda job: self.update_jira_issue(*job), jobs))
+
+    def report_results(self, results):
+        """Log a summary of the update results and write them to the report file, if configured."""
+        counts = {}
+        for result in results:
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+        retried = sum(1 for result in results if result['retries'])
+        logger.info(
+            f"Update finished: {counts.get('succeeded', 0)} succeeded, {counts.get('failed', 0)} failed, "
+            f"{counts.get('unchanged', 0)} unchanged, {counts.get('skipped', 0)} skipped, {retried} needed retries"
+        )
+        if self.report_file:
+            with open(self.report_file, 'w', encoding='utf-8') as f:
+                json.dump({'summary': dict(counts, retried=retried), 'issues': results}, f, indent=2)
+            logger.info(f"Update report written to {self.report_file}")
 
     def generate_description(self, summary, category, team):
         """Generate the Jira issue description as a markdown table."""
-        template = Template('''
-        h2. Task Details
+        # Compile the template once per updater rather than once per row
+        if self.description_template is None:
+            from jinja2 import Template
+            self.description_template = Template(DESCRIPTION_TEMPLATE)
+        return self.description_template.render(summary=summary, category=category, team=team)
 
-        || Item || Description ||
-        | *Summary* | {{ summary }} |
-        | *Category* | {{ category }} |
-        | *Team* | {{ team }} |
-        ''')
-        return template.render(summary=summary, category=category, team=team)
+    def build_update_plan(self):
+        """Build the update jobs for the workbook.
+
+        Returns (jobs, results): jobs is a list of (issue key, update data) for
+        the rows that need sending, results holds a record for every row that
+        was skipped or is unchanged.
+        """
+        df = self.read_update_columns()
+        logger.info(f"Building update plan for {len(df)} rows...")
+
+        # Validate every row at once: a value is missing when it is empty or blank
+        text = df.apply(lambda column: column.astype('string').str.strip())
+        missing = (text.isna() | (text == '')).any(axis=1)
+
+        results = []
+        if missing.any():
+            logger.error(f"Missing required fields for {int(missing.sum())} rows. Skipping these issues.")
+            results.extend(skipped_result(issue_key, 'Missing required fields') for issue_key in df.loc[missing, 'Task Key'])
+
+        # Diff every valid row against the values the sheet held at export time
+        changed = []
+        valid = text[~missing]
+        for issue_key, *row in zip(valid['Task Key'], *(valid[column] for column in SNAPSHOT_COLUMNS)):
+            values = dict(zip(SNAPSHOT_COLUMNS, row))
+            columns = self.changed_columns(issue_key, values)
+            if not columns:
+                results.append({'issue_key': issue_key, 'status': 'unchanged', 'status_code': None, 'retries': 0, 'error': None})
+                continue
+            changed.append((issue_key, values, columns))
+
+        # Resolve every distinct reassigned name once before building any update
+        resolved = self.assignee_resolver.resolve_all(
+            {values['Assignee'] for _, values, columns in changed if 'Assignee' in columns}
+        )
+
+        jobs = []
+        unresolved = []
+        self.sheet_values = {}
+        for issue_key, values, columns in changed:
+            fields = {}
+            if 'Summary' in columns:
+                fields['summary'] = values['Summary']
+            if 'Priority' in columns:
+                fields['priority'] = {'name': values['Priority']}
+            if 'Assignee' in columns:
+                account_id = resolved.get(values['Assignee'])
+                if account_id is None:
+                    unresolved.append((issue_key, values['Assignee']))
+                    continue
+                fields['assignee'] = {'accountId': account_id}  # Use account ID for assignment
+            if any(column in columns for column in DESCRIPTION_COLUMNS):
+                # Generate the formatted description with only Summary, Category, and Team
+                fields['description'] = self.generate_description(values['Summary'], values['Category'], values['Team'])
+            jobs.append((issue_key, {"fields": fields}))
+            self.sheet_values[issue_key] = values
+
+        if unresolved:
+            logger.error(f"Assignee not found for {len(unresolved)} rows. Skipping these issues.")
+            results.extend(skipped_result(issue_key, f"Assignee '{assignee}' not found") for issue_key, assignee in unresolved)
+
+        logger.info(f"Update plan has {len(jobs)} issues to update")
+        return jobs, results
+
+    def save_plan(self, jobs):
+        """Write the update jobs to the plan file so they can be reviewed and replayed."""
+        with open(self.plan_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'excel_file': self.excel_file,
+                'created': datetime.now(timezone.utc).isoformat(),
+                'jobs': [
+                    {'issue_key': issue_key, 'update': update_data, 'sheet_values': self.sheet_values.get(issue_key)}
+                    for issue_key, update_data in jobs
+                ]
+            }, f)
+        logger.info(f"Update plan with {len(jobs)} jobs saved to {self.plan_file}")
+
+    def load_plan(self):
+        """Read the update jobs back from the plan file."""
+        with open(self.plan_file, encoding='utf-8') as f:
+            plan = json.load(f)
+        logger.info(f"Loaded update plan with {len(plan['jobs'])} jobs created {plan['created']} from {plan['excel_file']}")
+        self.sheet_values = {job['issue_key']: job['sheet_values'] for job in plan['jobs'] if job.get('sheet_values')}
+        return [(job['issue_key'], job['update']) for job in plan['jobs']]
+
+    def apply_plan(self, jobs, results=()):
+        """Send the update jobs to Jira and report the results."""
+        # Update the Jira issues concurrently under the shared rate limit
+        update_results = self.run_updates(jobs)
+        self.save_snapshot(update_results, jobs)
+        results = list(results) + update_results
+        self.report_results(results)
+        return results
+
+    def replay_plan(self):
+        """Apply a previously saved update plan without re-reading the workbook."""
+        return self.apply_plan(self.load_plan())
 
     def process_and_update_issues(self):
         """Process the Excel file and update the corresponding Jira issues."""
-        # Read the Excel file
-        df = self.read_excel()
-
-        # Iterate over the DataFrame rows and update the Jira issues
-        for index, row in df.iterrows():
-            issue_key = row.get('Task Key', None)
-            priority = row.get('Priority', None)
-            summary = row.get('Summary', None)
-            assignee = row.get('Assignee', None)
-            category = row.get('Category', None)  # Assuming this is the column for Category
-            team = row.get('Team', None)  # Assuming this is the column for Team
-
-            # Skip if mandatory fields are missing
-            if not issue_key or not priority or not summary or not assignee or not category or not team:
-                logger.error(f"Missing required fields for issue {issue_key}. Skipping this issue.")
-                continue
+        jobs, results = self.build_update_plan()
+        if self.plan_file:
+            self.save_plan(jobs)
 
-            # Get the account ID of the assignee
-            assignee_account_id = self.get_assignee_account_id(assignee)
+        if self.dry_run:
+            self.report_diff(jobs, results)
+            return results
+        return self.apply_plan(jobs, results)
 
-            if not assignee_account_id:
-                logger.error(f"Assignee '{assignee}' not found, skipping update for issue {issue_key}.")
-                continue
+    def report_diff(self, jobs, results):
+        """Log the pending changes without sending anything to Jira."""
+        field_counts = {}
+        for issue_key, update_data in jobs:
+            logger.info(f"[dry run] {issue_key}: would update {', '.join(update_data['fields'])}")
+            for name in update_data['fields']:
+                field_counts[name] = field_counts.get(name, 0) + 1
+        unchanged = sum(1 for result in results if result['status'] == 'unchanged')
+        logger.info(
+            f"[dry run] {len(jobs)} issues would be updated, {unchanged} unchanged, "
+            f"{len(results) - unchanged} skipped; changed fields: {field_counts or 'none'}"
+        )
 
-            # Generate the formatted description with only Summary, Category, and Team
-            description = self.generate_description(summary, category, team)
-
-            # Prepare the data to update in Jira
-            update_data = {
-                "fields": {
-                    "summary": self.sanitize_data(summary),
-                    "priority": {"name": self.sanitize_data(priority)},
-                    "assignee": {"accountId": assignee_account_id},  # Use account ID for assignment
-                    "description": description  # Adding the formatted description with specific fields
-                }
-            }
+def build_parser():
+    """Command line options; every option can also be set by key in a JSON --config file."""
+    parser = argparse.ArgumentParser(description="Export Jira issues to Excel/CSV/JSONL/Parquet and push edits back to Jira.")
+    parser.add_argument('action', nargs='?', choices=ACTIONS,
+                        help="fetch/resync the export, update/dry-run/replay edits, or watch to re-sync on an interval "
+                             "(prompted for when omitted on a terminal)")
+    parser.add_argument('--config', help="JSON file with option values keyed by option name, e.g. \"export_profile\"; "
+                             "command-line options override it")
+    parser.add_argument('--url', default=os.environ.get(ENV_JIRA_URL), help=f"Jira site URL (default: ${ENV_JIRA_URL})")
+    parser.add_argument('--email', default=os.environ.get(ENV_JIRA_EMAIL), help=f"Jira account email (default: ${ENV_JIRA_EMAIL})")
+    parser.add_argument('--api-token', default=os.environ.get(ENV_JIRA_API_TOKEN),
+                        help=f"Jira API token (default: ${ENV_JIRA_API_TOKEN}; prefer the variable, arguments show up in ps)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_FILE, help="workbook to export to and update from")
+    parser.add_argument('--jql', help=f"issues to export (default: {DEFAULT_JQL}, or every issue of --projects)")
+    parser.add_argument('--projects', nargs='+', help="export several projects, one shard each")
+    parser.add_argument('--shard-size', type=int,
+                        help=f"split queries larger than this many issues (e.g. {DEFAULT_SHARD_SIZE}) into created-date "
+                             f"shards fetched in parallel; off by default or with 0")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help="issues requested per search page")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help="concurrent requests for page prefetching, shards and updates")
+    parser.add_argument('--export-profile', default=DEFAULT_EXPORT_PROFILE, choices=sorted(EXPORT_PROFILES))
+    parser.add_argument('--report-savings', action='store_true',
+                        help="sample every field once to log the bytes saved by the field projection")
+    parser.add_argument('--expand-mode', default=DEFAULT_EXPAND_MODE, choices=EXPAND_MODES,
+                        help="re-fetch worklogs/comments only for issues Jira truncated, or leave them out of "
+                             "the search and fetch worklogs for issues with time logged")
+    parser.add_argument('--expand-keys', nargs='+', default=[],
+                        help="issue keys whose full worklogs and comments are always fetched")
+    parser.add_argument('--formats', nargs='+', default=DEFAULT_EXPORT_FORMATS, choices=sorted(EXPORT_SINKS))
+    parser.add_argument('--rate', type=float, default=DEFAULT_UPDATE_RATE, help="update requests per second, shared by all workers")
+    parser.add_argument('--burst', type=int, default=DEFAULT_UPDATE_BURST, help="update requests allowed in a burst")
+    parser.add_argument('--assignee-cache', default=DEFAULT_ASSIGNEE_CACHE_FILE,
+                        help="file caching assignee account IDs between runs (empty to disable)")
+    parser.add_argument('--store', default=DEFAULT_STORE_FILE, help="local issue store used for incremental syncs")
+    parser.add_argument('--interval', type=float, default=DEFAULT_WATCH_INTERVAL, help="seconds between watch cycles")
+    parser.add_argument('--cycles', type=int, default=0, help="stop watching after this many cycles (0 = run until stopped)")
+    parser.add_argument('--metrics-file', default=DEFAULT_METRICS_FILE)
+    parser.add_argument('--prometheus-file', default=DEFAULT_PROMETHEUS_FILE)
+    parser.add_argument('--profile-file', help="profile the run with cProfile and write the stats here")
+    parser.add_argument('--trace-memory', action='store_true', help="log the top allocations with tracemalloc")
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    return parser
 
-            logger.info(f"Updating issue {issue_key} with data: {update_data}")
+def config_value(parser, action, value, config_file):
+    """Check a --config value the way argparse checks the command line, since set_defaults skips type, nargs and choices."""
+    option = action.option_strings[-1] if action.option_strings else action.dest
+    if action.nargs == 0:
+        if not isinstance(value, bool):
+            parser.error(f"{option} in {config_file} must be true or false")
+        return value
+    is_list = action.nargs in ('+', '*')
+    if is_list != isinstance(value, list):
+        parser.error(f"{option} in {config_file} must be {'a list' if is_list else 'a single value'}")
+    if is_list and action.nargs == '+' and not value:
+        parser.error(f"{option} in {config_file} must not be empty")
+    items = []
+    for item in value if is_list else [value]:
+        if isinstance(item, (dict, list, bool)):
+            parser.error(f"{option} in {config_file} has an invalid value: {item!r}")
+        if action.type is not None and item is not None:
+            try:
+                item = action.type(str(item))
+            except (TypeError, ValueError):
+                parser.error(f"{option} in {config_file} has an invalid value: {item!r}")
+        if action.choices is not None and item not in action.choices:
+            parser.error(f"{option} in {config_file} must be one of: {', '.join(map(str, action.choices))} (got {item!r})")
+        items.append(item)
+    return items if is_list else items[0]
 
-            # Update the Jira issue
-            self.update_jira_issue(issue_key, update_data)
+def parse_args(argv=None):
+    """Parse the command line, filling unset options from the --config file."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config = json.load(f)
+        known = {action.dest for action in parser._actions}
+        unknown = sorted(set(config) - known)
+        if unknown:
+            parser.error(f"Unknown option(s) in {args.config}: {', '.join(unknown)}")
+        actions = {action.dest: action for action in parser._actions}
+        for name, value in config.items():
+            config[name] = config_value(parser, actions[name], value, args.config)
+        # File values replace the defaults, so anything given on the command line still wins
+        parser.set_defaults(**config)
+        args = parser.parse_args(argv)
 
-def main():
-    try:              
-        output_file = 'jira_tasks.xlsx'
-        base_url = "https://myworkspace.atlassian.net"  # Correct base URL
-        jira_search_url = f"{base_url}/rest/api/2/search"  # URL for fetching data
-        email = "ysername@example.com"
-        api_token = "xxxxxxxxxxxxxxxxxxxxx"
+    if args.action is None:
+        if not sys.stdin.isatty():
+            parser.error("an action is required when not running on a terminal")
+        args.action = input("Choose an action: Type 'fetch' to fetch Jira data, 'resync' to re-fetch everything, 'update' to update Jira issues from the Excel file, 'dry-run' to preview and save the update plan, 'replay' to apply a saved plan, or 'watch' to keep re-syncing: ").strip().lower()
+        if args.action not in ACTIONS:
+            parser.error(f"Invalid choice. Please type one of: {', '.join(ACTIONS)}.")
+    missing = [f"--{name.replace('_', '-')}" for name in ('url', 'email', 'api_token') if not getattr(args, name)]
+    if missing:
+        parser.error(f"missing {', '.join(missing)} (or ${ENV_JIRA_URL}, ${ENV_JIRA_EMAIL}, ${ENV_JIRA_API_TOKEN})")
+    # Checked here rather than by type= so that values from the --config file are covered too
+    for name in ('page_size', 'workers', 'rate', 'burst'):
+        if getattr(args, name) <= 0:
+            parser.error(f"--{name.replace('_', '-')} must be positive")
+    args.url = args.url.rstrip('/')
+    return args
 
-        user_choice = input("Choose an action: Type 'fetch' to fetch Jira data or 'update' to update Jira issues from the Excel file: ").strip().lower()
+def create_formatter(args):
+    """Build the exporter for the configured site, query and columns."""
+    return JiraExcelFormatter(
+        f"{args.url}/rest/api/2/search", args.email, args.api_token, args.output, jql=args.jql,
+        page_size=args.page_size, max_workers=args.workers, profile=args.export_profile,
+        snapshot_file=snapshot_path(args.output), expand_mode=args.expand_mode, expand_keys=args.expand_keys,
+        projects=args.projects, report_savings=args.report_savings,
+        # A shard size of 0 would split shards down to one-minute ranges; treat it as sharding off
+        shard_size=args.shard_size if args.shard_size and args.shard_size > 0 else None
+    )
 
-        if user_choice == 'fetch':
-            # Create an instance of the JiraExcelFormatter class with the search URL
-            jira_formatter = JiraExcelFormatter(jira_search_url, email, api_token, output_file)
-    
-            # Fetch Jira data
-            issues = jira_formatter.fetch_jira_data()
-    
-            # Prepare task list
-            task_list = jira_formatter.prepare_task_list(issues)
-    
-            # Save data to Excel
-            jira_formatter.save_to_excel(task_list)
-    
-            # Format the Excel file
-            jira_formatter.format_excel()            
-            
-        elif user_choice == 'update':
-            # Use base URL for updating issues
-            jira_updater = JiraUpdaterFromExcel(base_url, email, api_token, output_file)
-            jira_updater.process_and_update_issues()
+def export_store(jira_formatter, store, formats):
+    """Export every issue in the local store and refresh the update snapshot, in one streaming pass.
+
+    Issues are read from the store one at a time, turned into rows,
+    snapshotted and handed to the sinks in batches, so memory does not grow with
+    the number of issues.
+    """
+    rows = jira_formatter.iter_task_rows(store.iter_issues())
+
+    # Remember the exported values so 'update' only sends rows edited in the sheet
+    if jira_formatter.snapshot_file:
+        rows = jira_formatter.snapshot_rows(rows)
+
+    # Save and format the Excel file, plus any other selected formats. Closing the
+    # rows right away lets a failed export clean up its partial snapshot file.
+    try:
+        jira_formatter.export(rows, formats)
+    finally:
+        rows.close()
+
+def write_metrics(args):
+    metrics.write_json(args.metrics_file)
+    metrics.write_prometheus(args.prometheus_file)
 
+def watch(args):
+    """Re-sync and re-export every interval until stopped, keeping the session, store and compiled columns warm."""
+    jira_formatter = create_formatter(args)
+    store = JiraIssueStore(args.store)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    logger.info(f"Watching Jira every {args.interval:g}s (Ctrl+C or SIGTERM to stop)")
+
+    cycle = 0
+    # The sync commits before the export runs, so a failed export stays pending until one succeeds
+    export_pending = True
+    try:
+        while not stop.is_set():
+            cycle += 1
+            metrics.reset()
+            started = time.monotonic()
+            try:
+                jira_formatter.sync_issue_store(store)
+                if export_pending or jira_formatter.last_sync_changes:
+                    export_pending = True
+                    export_store(jira_formatter, store, args.formats)
+                    export_pending = False
+                else:
+                    logger.info("No changes since the last cycle, keeping the existing export")
+            except SystemExit:
+                # The fetch and export helpers exit on errors; a daemon retries on the next cycle instead
+                logger.error(f"Watch cycle {cycle} failed, retrying in {args.interval:g}s")
+            except Exception:
+                logger.exception(f"Watch cycle {cycle} failed, retrying in {args.interval:g}s")
+            write_metrics(args)
+
+            if args.cycles and cycle >= args.cycles:
+                break
+            stop.wait(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.close()
+        logger.info(f"Stopped watching after {cycle} cycles")
+
+def run_action(args):
+    """Run a single fetch/resync/update/dry-run/replay action."""
+    if args.action in ('fetch', 'resync'):
+        # Sync changed issues into the local store and rebuild the export from it
+        jira_formatter = create_formatter(args)
+        store = JiraIssueStore(args.store)
+        jira_formatter.sync_issue_store(store, full_resync=(args.action == 'resync'))
+        export_store(jira_formatter, store, args.formats)
+        store.close()
+
+    else:
+        # Use base URL for updating issues
+        jira_updater = JiraUpdaterFromExcel(
+            args.url, args.email, args.api_token, args.output, max_workers=args.workers,
+            assignee_cache_file=args.assignee_cache or None, rate=args.rate, burst=args.burst,
+            report_file=DEFAULT_UPDATE_REPORT_FILE, snapshot_file=snapshot_path(args.output),
+            dry_run=(args.action == 'dry-run'), plan_file=DEFAULT_UPDATE_PLAN_FILE
+        )
+        if args.action == 'replay':
+            jira_updater.replay_plan()
         else:
-            logger.error("Invalid choice. Please type 'fetch' or 'update'.")
-            sys.exit(1)
+            jira_updater.process_and_update_issues()
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger.setLevel(args.log_level)
+    metrics.reset()  # Each call is its own run, also when main() is called in-process
+    try:
+        if args.action == 'watch':
+            profile_run(lambda: watch(args), args.profile_file, args.trace_memory)
+            return
+        try:
+            profile_run(lambda: run_action(args), args.profile_file, args.trace_memory)
+        finally:
+            write_metrics(args)
 
     except Exception as e:
         logger.exception("An unexpected error occurred in the main function")
@@ -0,0 +1,65 @@
+"""Row extraction must fall back to column defaults for missing, null and wrongly shaped fields."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+
+DEFAULTS = tuple(default for _, _, _, default in jira.TASK_COLUMNS)
+
+
+def row_dict(issue):
+    return dict(zip(jira.TASK_COLUMN_NAMES, jira.extract_task_row(issue)))
+
+
+@pytest.mark.parametrize('issue', [
+    {'key': 'DEV-1'},
+    {'key': 'DEV-1', 'fields': None},
+    {'key': 'DEV-1', 'fields': {}},
+    {'key': 'DEV-1', 'fields': {name: None for name in jira.JIRA_FIELD_IDS}},
+], ids=['no-fields', 'null-fields', 'empty-fields', 'null-values'])
+def test_missing_fields_give_defaults(issue):
+    assert jira.extract_task_row(issue) == ('DEV-1',) + DEFAULTS[1:]
+
+
+def test_null_category_gives_default():
+    row = row_dict({'key': 'DEV-1', 'fields': {'customfield_10035': None, 'summary': 'Deploy'}})
+    assert row['Category'] == 'No Category'
+    assert row['Summary'] == 'Deploy'
+
+
+def test_wrongly_shaped_values_give_defaults():
+    row = row_dict({'key': 'DEV-1', 'fields': {
+        'assignee': 'Alice',                  # String where an object is expected
+        'priority': ['High'],                 # List where an object is expected
+        'labels': 5,                          # Scalar where a list is expected
+        'fixVersions': {'name': '1.0'},       # Object where a list is expected
+        'customfield_10020': [None, 'x', {}]  # List items without the wanted key
+    }})
+    assert row['Assignee'] == 'Unassigned'
+    assert row['Priority'] == 'No Priority'
+    assert row['Labels'] == 'No Labels'
+    assert row['Fix Versions'] == 'No Fix Versions'
+    assert row['Sprint'] == ''
+
+
+def test_join_stringifies_items_and_skips_nulls():
+    row = row_dict({'key': 'DEV-1', 'fields': {
+        'labels': ['ops', 3, None],
+        'fixVersions': [{'name': 1.5}, {'name': None}, {'name': '2.0'}],
+        'customfield_10021': [{'value': 'Impediment'}]
+    }})
+    assert row['Labels'] == 'ops, 3'
+    assert row['Fix Versions'] == '1.5, 2.0'
+    assert row['Flagged'] == 'Yes'
+
+
+def test_profile_spec_matches_full_spec():
+    issue = {'key': 'DEV-1', 'fields': {'summary': 'Deploy', 'assignee': {'displayName': 'Alice'}, 'labels': ['a']}}
+    columns = jira.columns_for_profile('minimal')
+    names = [name for name, _, _, _ in columns]
+    full = row_dict(issue)
+    assert jira.compile_column_spec(columns)(issue) == tuple(full[name] for name in names)
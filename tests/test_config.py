@@ -0,0 +1,53 @@
+"""Values from --config must be checked like the same options given on the command line."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+
+CREDENTIALS = ['--url', 'http://jira.example/', '--email', 'e', '--api-token', 't']
+
+
+def parse_with_config(tmp_path, config, *argv):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+    return jira.parse_args(['fetch', '--config', str(path), *CREDENTIALS, *argv])
+
+
+def test_config_values_are_applied(tmp_path):
+    args = parse_with_config(tmp_path, {
+        'formats': ['csv', 'jsonl'], 'workers': 3, 'rate': '2.5', 'report_savings': True, 'shard_size': None,
+    })
+    assert args.formats == ['csv', 'jsonl']
+    assert args.workers == 3
+    assert args.rate == 2.5
+    assert args.report_savings is True
+    assert args.shard_size is None
+
+
+def test_command_line_wins_over_config(tmp_path):
+    args = parse_with_config(tmp_path, {'workers': 3, 'formats': ['csv']}, '--workers', '5')
+    assert args.workers == 5
+    assert args.formats == ['csv']
+
+
+@pytest.mark.parametrize('config', [
+    {'formats': 'csv'},
+    {'formats': ['csv', 'xls']},
+    {'projects': []},
+    {'export_profile': 'huge'},
+    {'export_profile': ['full']},
+    {'workers': 'many'},
+    {'workers': 1.5},
+    {'workers': True},
+    {'report_savings': 'yes'},
+    {'no_such_option': 1},
+], ids=lambda config: json.dumps(config))
+def test_invalid_config_values_are_rejected(tmp_path, capsys, config):
+    with pytest.raises(SystemExit):
+        parse_with_config(tmp_path, config)
+    assert 'config.json' in capsys.readouterr().err
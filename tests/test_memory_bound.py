@@ -0,0 +1,44 @@
+"""Peak memory of a full resync + export must not grow with the number of issues.
+
+Small variant of benchmarks/check_memory_bound.py: the page size, worker count
+and export batch size are shrunk so that a few hundred issues already exceed
+the fixed working set, which keeps the runs short enough for the test suite.
+"""
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import jira_fetch_and_update as jira
+from check_memory_bound import peak_memory
+
+SMALL, LARGE = 300, 1500
+MAX_GROWTH = 1.5
+OPTIONS = ['--page-size', '20', '--workers', '2']
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    monkeypatch.setattr(jira, 'EXPORT_BATCH_SIZE', 50)
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+
+@pytest.mark.parametrize('formats, shard_size', [
+    (jira.DEFAULT_EXPORT_FORMATS, 0),
+    (['xlsx', 'csv'], 100),
+], ids=['xlsx', 'xlsx-csv-sharded'])
+def test_peak_memory_is_bounded(traced, formats, shard_size):
+    pytest.importorskip('xlsxwriter')
+    small = peak_memory(SMALL, formats, shard_size, OPTIONS)
+    large = peak_memory(LARGE, formats, shard_size, OPTIONS)
+    assert large <= small * MAX_GROWTH, (
+        f"{LARGE // SMALL}x the issues took {large / small:.2f}x the peak memory "
+        f"({small / 2 ** 20:.1f} MB -> {large / 2 ** 20:.1f} MB)"
+    )
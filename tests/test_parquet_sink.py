@@ -0,0 +1,34 @@
+"""Values the Parquet sink cannot convert must become nulls instead of failing the export."""
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+
+COLUMNS = ['Task Key', 'Votes', 'Due Date', 'Created']
+
+
+def test_unconvertible_values_are_stored_as_null(tmp_path, caplog):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    sink = jira.ParquetSink(str(tmp_path / 'tasks.parquet'))
+    sink.open(COLUMNS)
+    with caplog.at_level(logging.WARNING, logger=jira.logger.name):
+        sink.write_batch([
+            ('DEV-1', '3', '2024-05-01', '2024-01-05T13:07:42.000+0000'),
+            ('DEV-2', 'many', '05/01/2024', 'yesterday'),
+            ('DEV-3', 2.5, None, '2024-01-05T13:07:42.000+0200'),
+        ])
+    sink.close()
+
+    table = parquet.read_table(sink.output_file).to_pydict()
+    assert table['Task Key'] == ['DEV-1', 'DEV-2', 'DEV-3']
+    assert table['Votes'] == [3, None, 2]
+    assert [value and value.isoformat() for value in table['Due Date']] == ['2024-05-01', None, None]
+    assert [value and value.strftime('%H:%M') for value in table['Created']] == ['13:07', None, '11:07']
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert len(warnings) == 3
+    assert any("'Votes'" in message and "'many'" in message for message in warnings)
@@ -0,0 +1,51 @@
+"""The update snapshot must only be replaced by a complete export."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+
+ISSUES = [{'key': f'DEV-{n}', 'fields': {'summary': f'Task {n}'}} for n in range(1, 6)]
+
+
+class ListStore:
+    def iter_issues(self):
+        return iter(ISSUES)
+
+
+def make_formatter(tmp_path):
+    return jira.JiraExcelFormatter('http://jira.example', 'e', 't', str(tmp_path / 'tasks.xlsx'),
+                                   snapshot_file=str(tmp_path / 'tasks.snapshot.json'))
+
+
+def test_complete_export_writes_snapshot(tmp_path, monkeypatch):
+    formatter = make_formatter(tmp_path)
+    monkeypatch.setattr(formatter, 'export', lambda rows, formats: list(rows))
+    jira.export_store(formatter, ListStore(), ['csv'])
+    with open(formatter.snapshot_file, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert list(snapshot) == [issue['key'] for issue in ISSUES]
+    assert snapshot['DEV-2']['Summary'] == 'Task 2'
+    assert os.listdir(tmp_path) == ['tasks.snapshot.json']
+
+
+def test_failed_export_keeps_previous_snapshot(tmp_path, monkeypatch):
+    formatter = make_formatter(tmp_path)
+    with open(formatter.snapshot_file, 'w', encoding='utf-8') as f:
+        f.write('{"DEV-1": {}}')
+
+    def failing_export(rows, formats):
+        next(rows)
+        next(rows)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(formatter, 'export', failing_export)
+    with pytest.raises(OSError):
+        jira.export_store(formatter, ListStore(), ['csv'])
+    assert os.listdir(tmp_path) == ['tasks.snapshot.json']
+    with open(formatter.snapshot_file, encoding='utf-8') as f:
+        assert json.load(f) == {'DEV-1': {}}
@@ -0,0 +1,138 @@
+"""read_xlsx_columns must read the update columns from workbooks written by any common tool."""
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jira_fetch_and_update as jira
+
+HEADER = ['Task Key', 'Summary', 'Status', 'Description', 'Team']
+ROWS = [
+    ['DEV-1', 'Deploy <runner> & cache', 'To Do', 'Long text\nwith lines', 'SRE'],
+    ['DEV-2', 'Rotate certificates', 'Done', 'x' * 5000, 'Platform'],
+    ['DEV-3', 'Deploy <runner> & cache', 'In Progress', '', 'SRE'],
+]
+WANTED = ['Task Key', 'Summary', 'Team']
+EXPECTED = {
+    'Task Key': ['DEV-1', 'DEV-2', 'DEV-3'],
+    'Summary': ['Deploy <runner> & cache', 'Rotate certificates', 'Deploy <runner> & cache'],
+    'Team': ['SRE', 'Platform', 'SRE'],
+}
+
+
+def write_xlsxwriter(path, constant_memory):
+    xlsxwriter = pytest.importorskip('xlsxwriter')
+    workbook = xlsxwriter.Workbook(str(path), {'constant_memory': constant_memory})
+    worksheet = workbook.add_worksheet()
+    for row_index, row in enumerate([HEADER] + ROWS):
+        worksheet.write_row(row_index, 0, row)
+    workbook.close()
+
+
+def write_raw(path, sheet_data, prefix=''):
+    """Write a minimal workbook by hand, with the worksheet's sheetData markup given as is."""
+    ns = f'xmlns{":" + prefix if prefix else ""}="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    tag = f'{prefix}:' if prefix else ''
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('xl/workbook.xml', (
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/></Relationships>'
+        ))
+        archive.writestr('xl/worksheets/sheet1.xml', (
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<{tag}worksheet {ns}><{tag}sheetData>'
+            f'{sheet_data}</{tag}sheetData><{tag}rowBreaks count="0"/></{tag}worksheet>'
+        ))
+
+
+def inline(value, ref=None, tag=''):
+    ref = f' r="{ref}"' if ref else ''
+    return f'<{tag}c{ref} t="inlineStr"><{tag}is><{tag}t>{value}</{tag}t></{tag}is></{tag}c>'
+
+
+@pytest.mark.parametrize('constant_memory', [True, False], ids=['inline-strings', 'shared-strings'])
+def test_xlsxwriter_workbooks(tmp_path, constant_memory):
+    path = tmp_path / 'tasks.xlsx'
+    write_xlsxwriter(path, constant_memory)
+    assert jira.read_xlsx_columns(str(path), WANTED) == EXPECTED
+
+
+def test_workbook_resaved_by_openpyxl(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = tmp_path / 'tasks.xlsx'
+    write_xlsxwriter(path, constant_memory=True)
+    workbook = openpyxl.load_workbook(path)
+    workbook.active['B3'] = 'Edited in the sheet'
+    workbook.save(path)
+    expected = dict(EXPECTED, Summary=['Deploy <runner> & cache', 'Edited in the sheet', 'Deploy <runner> & cache'])
+    assert jira.read_xlsx_columns(str(path), WANTED) == expected
+
+
+def test_missing_cells_read_as_none(tmp_path):
+    openpyxl = pytest.importorskip('openpyxl')
+    path = tmp_path / 'tasks.xlsx'
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    sheet.append(['DEV-1', None, 'To Do', None, None])
+    sheet.append(['DEV-2', 'Rotate certificates', None, None, 'Platform'])
+    workbook.save(path)
+    assert jira.read_xlsx_columns(str(path), WANTED) == {
+        'Task Key': ['DEV-1', 'DEV-2'],
+        'Summary': [None, 'Rotate certificates'],
+        'Team': [None, 'Platform'],
+    }
+
+
+def test_cells_without_references(tmp_path):
+    path = tmp_path / 'tasks.xlsx'
+    write_raw(path, (
+        '<row>' + ''.join(inline(name) for name in ['Task Key', 'Summary', 'Team']) + '</row>'
+        '<row>' + inline('DEV-1') + inline('Deploy') + inline('SRE') + '</row>'
+        # A referenced cell jumps ahead; the next unreferenced cell follows it
+        '<row r="3">' + inline('DEV-2', 'A3') + inline('Platform', 'C3') + '</row>'
+        '<row r="4"/>'
+        '<row r="5"><c r="A5"><v>42</v></c><c r="B5" t="b"><v>1</v></c><c><v>1.5</v></c></row>'
+    ))
+    assert jira.read_xlsx_columns(str(path), WANTED) == {
+        'Task Key': ['DEV-1', 'DEV-2', None, 42],
+        'Summary': ['Deploy', None, None, True],
+        'Team': ['SRE', 'Platform', None, 1.5],
+    }
+
+
+def test_prefixed_namespace(tmp_path):
+    path = tmp_path / 'tasks.xlsx'
+    write_raw(path, (
+        '<x:row r="1">' + inline('Task Key', 'A1', 'x:') + inline('Team', 'B1', 'x:') + '</x:row>'
+        '<x:row r="2">' + inline('DEV-1', 'A2', 'x:') + inline('SRE', 'B2', 'x:') + '</x:row>'
+    ), prefix='x')
+    assert jira.read_xlsx_columns(str(path), WANTED) == {'Task Key': ['DEV-1'], 'Team': ['SRE']}
+
+
+def test_missing_header_column(tmp_path):
+    path = tmp_path / 'tasks.xlsx'
+    write_xlsxwriter(path, constant_memory=True)
+    assert jira.read_xlsx_columns(str(path), ['Task Key', 'Assignee']) == {'Task Key': EXPECTED['Task Key']}
+
+    updater = jira.JiraUpdaterFromExcel('http://jira.example', 'e', 't', str(path))
+    with pytest.raises(SystemExit):
+        updater.read_update_columns(['Task Key', 'Assignee'])
+
+
+def test_columns_after_the_last_wanted_one_are_not_needed(tmp_path):
+    # A malformed cell to the right of every wanted column must not matter
+    path = tmp_path / 'tasks.xlsx'
+    write_raw(path, (
+        '<row r="1">' + inline('Task Key', 'A1') + inline('Team', 'B1') + inline('Description', 'C1') + '</row>'
+        '<row r="2">' + inline('DEV-1', 'A2') + inline('SRE', 'B2') + '<c r="C2"><v>not a number</v></c></row>'
+    ))
+    assert jira.read_xlsx_columns(str(path), WANTED) == {'Task Key': ['DEV-1'], 'Team': ['SRE']}